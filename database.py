@@ -1,310 +1,527 @@
 """
 Base de datos PostgreSQL para el sistema de dashboard.
 Usa SQLAlchemy para interactuar con PostgreSQL.
+Todas las funciones reciben la sesión del request (``db``) en lugar de abrir una propia.
 """
 
 from database_models import (
-    get_db_service, SedeModel, ParticipanteModel, AcudienteModel, UsuarioModel, MensualidadModel
+    SedeModel, ParticipanteModel, AcudienteModel, UsuarioModel, MensualidadModel
 )
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import bindparam, exists, func, select
+from sqlalchemy.orm import Session, joinedload
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import os
+import time
 
 # ============================================================================
-# Funciones de compatibilidad con la API existente
+# Sedes
 # ============================================================================
 
-def get_participante_with_sede(participante_id: int) -> Optional[Dict[str, Any]]:
-    """Obtiene un participante con información de sede"""
-    db = get_db_service().get_db()
-    try:
-        participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == participante_id).first()
-        if not participante:
-            return None
+def _sede_to_dict(sede: SedeModel) -> Dict[str, Any]:
+    """Convierte una sede en el dict que se incluye en las respuestas"""
+    return {
+        "id": sede.id,
+        "nombre": sede.nombre,
+        "direccion": sede.direccion,
+        "telefono": sede.telefono,
+        "capacidad_maxima": sede.capacidad_maxima,
+        "estado": sede.estado,
+        "tipo": sede.tipo
+    }
 
-        sede = db.query(SedeModel).filter(SedeModel.id == participante.id_sede).first()
 
-        return {
-            "id": participante.id,
-            "nombres": participante.nombres,
-            "apellidos": participante.apellidos,
-            "tipo_documento": participante.tipo_documento,
-            "numero_documento": participante.numero_documento,
-            "fecha_nacimiento": participante.fecha_nacimiento,
-            "genero": participante.genero,
-            "fecha_ingreso": participante.fecha_ingreso,
-            "estado": participante.estado,
-            "id_sede": participante.id_sede,
-            "telefono": participante.telefono,
-            "sede": {
-                "id": sede.id,
-                "nombre": sede.nombre,
-                "direccion": sede.direccion,
-                "telefono": sede.telefono,
-                "capacidad_maxima": sede.capacidad_maxima,
-                "estado": sede.estado,
-                "tipo": sede.tipo
-            } if sede else None
-        }
-    finally:
-        db.close()
+# ============================================================================
+# Caché en proceso de respuestas de lectura
+# ============================================================================
+
+# Sedes, usuarios y estadísticas cambian poco y se consultan mucho: las apps las
+# guardan en memoria por unos segundos para no ir a la base de datos en cada request.
+# Toda escritura que cambie una tabla contada en las estadísticas invalida "stats".
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", "15"))
+_response_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def get_cached_response(key: str) -> Optional[Any]:
+    """Devuelve el valor cacheado si no ha expirado"""
+    entry = _response_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def get_stale_response(key: str) -> Optional[Any]:
+    """Devuelve el último valor cacheado aunque haya expirado (respaldo ante errores)"""
+    entry = _response_cache.get(key)
+    return entry[1] if entry is not None else None
+
 
+def set_cached_response(key: str, value: Any, ttl: int = RESPONSE_CACHE_TTL) -> None:
+    """Guarda un valor en la caché durante ``ttl`` segundos"""
+    _response_cache[key] = (time.monotonic() + ttl, value)
 
-def get_acudiente_with_participante(acudiente_id: int) -> Optional[Dict[str, Any]]:
+
+def invalidate_response_cache(*keys: str) -> None:
+    """Invalida las claves indicadas (o toda la caché si no se pasa ninguna)"""
+    if not keys:
+        _response_cache.clear()
+    for key in keys:
+        _response_cache.pop(key, None)
+
+
+# ============================================================================
+# Funciones de compatibilidad con la API existente
+# ============================================================================
+
+def get_participante_with_sede(db: Session, participante_id: int) -> Optional[Dict[str, Any]]:
+    """Obtiene un participante con información de sede"""
+    participante = db.get(ParticipanteModel, participante_id)
+    if not participante:
+        return None
+
+    sede = db.get(SedeModel, participante.id_sede)
+
+    return {
+        "id": participante.id,
+        "nombres": participante.nombres,
+        "apellidos": participante.apellidos,
+        "tipo_documento": participante.tipo_documento,
+        "numero_documento": participante.numero_documento,
+        "fecha_nacimiento": participante.fecha_nacimiento,
+        "genero": participante.genero,
+        "fecha_ingreso": participante.fecha_ingreso,
+        "estado": participante.estado,
+        "id_sede": participante.id_sede,
+        "telefono": participante.telefono,
+        "sede": _sede_to_dict(sede) if sede else None
+    }
+
+
+def get_acudiente_with_participante(db: Session, acudiente_id: int) -> Optional[Dict[str, Any]]:
     """Obtiene un acudiente con información del participante"""
-    db = get_db_service().get_db()
-    try:
-        acudiente = db.query(AcudienteModel).filter(AcudienteModel.id_acudiente == acudiente_id).first()
-        if not acudiente:
-            return None
+    acudiente = db.get(
+        AcudienteModel, acudiente_id,
+        options=[joinedload(AcudienteModel.participante)]
+    )
+    if not acudiente:
+        return None
+
+    participante = acudiente.participante
+
+    return {
+        "id_acudiente": acudiente.id_acudiente,
+        "nombres": acudiente.nombres,
+        "apellidos": acudiente.apellidos,
+        "tipo_documento": acudiente.tipo_documento,
+        "numero_documento": acudiente.numero_documento,
+        "parentesco": acudiente.parentesco,
+        "telefono": acudiente.telefono,
+        "email": acudiente.email,
+        "direccion": acudiente.direccion,
+        "id_participante": acudiente.id_participante,
+        "participante": {
+            "id": participante.id,
+            "nombres": participante.nombres,
+            "apellidos": participante.apellidos
+        } if participante else None
+    }
 
-        participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == acudiente.id_participante).first()
 
-        return {
+def get_mensualidad_with_relations(db: Session, mensualidad_id: int) -> Optional[Dict[str, Any]]:
+    """Obtiene una mensualidad con datos relacionados"""
+    mensualidad = db.get(
+        MensualidadModel, mensualidad_id,
+        options=[joinedload(MensualidadModel.participante), joinedload(MensualidadModel.acudiente)]
+    )
+    if not mensualidad:
+        return None
+
+    participante = mensualidad.participante
+    acudiente = mensualidad.acudiente
+
+    return {
+        "id": mensualidad.id,
+        "participant_id": mensualidad.participant_id,
+        "id_acudiente": mensualidad.id_acudiente,
+        "mes": mensualidad.mes,
+        "año": mensualidad.año,
+        "monto": float(mensualidad.monto),
+        "estado": mensualidad.estado,
+        "metodo_pago": mensualidad.metodo_pago,
+        "fecha_pago": mensualidad.fecha_pago,
+        "observaciones": mensualidad.observaciones,
+        "participante": {
+            "id": participante.id,
+            "nombres": participante.nombres,
+            "apellidos": participante.apellidos
+        } if participante else None,
+        "acudiente": {
             "id_acudiente": acudiente.id_acudiente,
             "nombres": acudiente.nombres,
-            "apellidos": acudiente.apellidos,
-            "tipo_documento": acudiente.tipo_documento,
-            "numero_documento": acudiente.numero_documento,
-            "parentesco": acudiente.parentesco,
-            "telefono": acudiente.telefono,
-            "email": acudiente.email,
-            "direccion": acudiente.direccion,
-            "id_participante": acudiente.id_participante,
-            "participante": {
-                "id": participante.id,
-                "nombres": participante.nombres,
-                "apellidos": participante.apellidos
-            } if participante else None
-        }
-    finally:
-        db.close()
+            "apellidos": acudiente.apellidos
+        } if acudiente else None
+    }
+
+
+# Listado de participantes con su sede: un SELECT con LEFT JOIN construido una sola
+# vez. El orden de las columnas es el que desempaqueta _build_participante_row.
+_PARTICIPANTES_WITH_SEDE = select(
+    ParticipanteModel.id,
+    ParticipanteModel.nombres,
+    ParticipanteModel.apellidos,
+    ParticipanteModel.tipo_documento,
+    ParticipanteModel.numero_documento,
+    ParticipanteModel.fecha_nacimiento,
+    ParticipanteModel.genero,
+    ParticipanteModel.fecha_ingreso,
+    ParticipanteModel.estado,
+    ParticipanteModel.id_sede,
+    ParticipanteModel.telefono,
+    SedeModel.id.label("s_id"),
+    SedeModel.nombre.label("s_nombre"),
+    SedeModel.direccion.label("s_direccion")
+).select_from(ParticipanteModel).outerjoin(
+    SedeModel, SedeModel.id == ParticipanteModel.id_sede
+)
 
 
-def get_mensualidad_with_relations(mensualidad_id: int) -> Optional[Dict[str, Any]]:
-    """Obtiene una mensualidad con datos relacionados"""
-    db = get_db_service().get_db()
-    try:
-        mensualidad = db.query(MensualidadModel).filter(MensualidadModel.id == mensualidad_id).first()
-        if not mensualidad:
-            return None
-
-        participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == mensualidad.participant_id).first()
-        acudiente = None
-        if mensualidad.id_acudiente:
-            acudiente = db.query(AcudienteModel).filter(AcudienteModel.id_acudiente == mensualidad.id_acudiente).first()
-
-        return {
-            "id": mensualidad.id,
-            "participant_id": mensualidad.participant_id,
-            "id_acudiente": mensualidad.id_acudiente,
-            "mes": mensualidad.mes,
-            "año": mensualidad.año,
-            "monto": mensualidad.monto,
-            "estado": mensualidad.estado,
-            "metodo_pago": mensualidad.metodo_pago,
-            "fecha_pago": mensualidad.fecha_pago,
-            "observaciones": mensualidad.observaciones,
-            "participante": {
-                "id": participante.id,
-                "nombres": participante.nombres,
-                "apellidos": participante.apellidos
-            } if participante else None,
-            "acudiente": {
-                "id_acudiente": acudiente.id_acudiente,
-                "nombres": acudiente.nombres,
-                "apellidos": acudiente.apellidos
-            } if acudiente else None
-        }
-    finally:
-        db.close()
+def _build_participante_row(row) -> Dict[str, Any]:
+    """Arma el dict de un participante desempaquetando la tupla por posición"""
+    (p_id, nombres, apellidos, tipo_documento, numero_documento, fecha_nacimiento,
+     genero, fecha_ingreso, estado, id_sede, telefono, s_id, s_nombre, s_direccion) = row
+    return {
+        "id": p_id,
+        "nombres": nombres,
+        "apellidos": apellidos,
+        "tipo_documento": tipo_documento,
+        "numero_documento": numero_documento,
+        "fecha_nacimiento": fecha_nacimiento,
+        "genero": genero,
+        "fecha_ingreso": fecha_ingreso,
+        "estado": estado,
+        "id_sede": id_sede,
+        "telefono": telefono,
+        "sede": {
+            "id": s_id,
+            "nombre": s_nombre,
+            "direccion": s_direccion
+        } if s_id is not None else None
+    }
+
+
+def get_all_participantes_with_sede(
+    db: Session, after_id: Optional[int] = None, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Obtiene los participantes con el resumen de su sede en una sola consulta.
+
+    Con ``after_id``/``limit`` devuelve una página ordenada por id (paginación por cursor).
+    """
+    stmt = _PARTICIPANTES_WITH_SEDE.order_by(ParticipanteModel.id)
+    if after_id is not None:
+        stmt = stmt.where(ParticipanteModel.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return [_build_participante_row(row) for row in db.execute(stmt)]
+
+
+# Listado completo: un único SELECT con LEFT JOIN que devuelve solo las columnas
+# necesarias, sin instanciar objetos ORM por fila. El orden de las columnas es el
+# que desempaqueta _build_mensualidad_out.
+_MENSUALIDADES_WITH_RELATIONS = select(
+    MensualidadModel.id,
+    MensualidadModel.participant_id,
+    MensualidadModel.id_acudiente,
+    MensualidadModel.mes,
+    MensualidadModel.año,
+    MensualidadModel.monto,
+    MensualidadModel.estado,
+    MensualidadModel.metodo_pago,
+    MensualidadModel.fecha_pago,
+    MensualidadModel.observaciones,
+    ParticipanteModel.id.label("p_id"),
+    ParticipanteModel.nombres.label("p_nombres"),
+    ParticipanteModel.apellidos.label("p_apellidos"),
+    AcudienteModel.id_acudiente.label("a_id"),
+    AcudienteModel.nombres.label("a_nombres"),
+    AcudienteModel.apellidos.label("a_apellidos")
+).select_from(MensualidadModel).outerjoin(
+    ParticipanteModel, ParticipanteModel.id == MensualidadModel.participant_id
+).outerjoin(
+    AcudienteModel, AcudienteModel.id_acudiente == MensualidadModel.id_acudiente
+)
 
 
-def get_all_mensualidades_with_relations() -> List[Dict[str, Any]]:
+@dataclass(slots=True)
+class MensualidadOut:
+    """Fila del listado de mensualidades; con slots ocupa menos memoria que un dict"""
+    id: int
+    participant_id: int
+    id_acudiente: Optional[int]
+    mes: int
+    año: int
+    monto: float
+    estado: str
+    metodo_pago: str
+    fecha_pago: Optional[str]
+    observaciones: Optional[str]
+    participante: Optional[Dict[str, Any]]
+    acudiente: Optional[Dict[str, Any]]
+
+
+def _build_mensualidad_out(row) -> MensualidadOut:
+    """Arma una fila del listado a partir de una tupla de la consulta"""
+    (id_, participant_id, id_acudiente, mes, año, monto, estado, metodo_pago,
+     fecha_pago, observaciones, p_id, p_nombres, p_apellidos, a_id, a_nombres, a_apellidos) = row
+    return MensualidadOut(
+        id_, participant_id, id_acudiente, mes, año, float(monto), estado, metodo_pago,
+        fecha_pago, observaciones,
+        {"id": p_id, "nombres": p_nombres, "apellidos": p_apellidos} if p_id is not None else None,
+        {"id_acudiente": a_id, "nombres": a_nombres, "apellidos": a_apellidos} if a_id is not None else None
+    )
+
+
+def get_all_mensualidades_with_relations(db: Session) -> List[MensualidadOut]:
     """Obtiene todas las mensualidades con datos relacionados"""
-    db = get_db_service().get_db()
-    try:
-        mensualidades = db.query(MensualidadModel).all()
-        result = []
-
-        for mensualidad in mensualidades:
-            participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == mensualidad.participant_id).first()
-            acudiente = None
-            if mensualidad.id_acudiente:
-                acudiente = db.query(AcudienteModel).filter(AcudienteModel.id_acudiente == mensualidad.id_acudiente).first()
-
-            result.append({
-                "id": mensualidad.id,
-                "participant_id": mensualidad.participant_id,
-                "id_acudiente": mensualidad.id_acudiente,
-                "mes": mensualidad.mes,
-                "año": mensualidad.año,
-                "monto": mensualidad.monto,
-                "estado": mensualidad.estado,
-                "metodo_pago": mensualidad.metodo_pago,
-                "fecha_pago": mensualidad.fecha_pago,
-                "observaciones": mensualidad.observaciones,
-                "participante": {
-                    "id": participante.id,
-                    "nombres": participante.nombres,
-                    "apellidos": participante.apellidos
-                } if participante else None,
-                "acudiente": {
-                    "id_acudiente": acudiente.id_acudiente,
-                    "nombres": acudiente.nombres,
-                    "apellidos": acudiente.apellidos
-                } if acudiente else None
-            })
-
-        return result
-    finally:
-        db.close()
+    return [_build_mensualidad_out(row) for row in db.execute(_MENSUALIDADES_WITH_RELATIONS)]
 
 
 # ============================================================================
 # Funciones de validación
 # ============================================================================
 
-def validate_sede_exists(sede_id: int) -> bool:
-    """Valida que una sede exista"""
-    db = get_db_service().get_db()
-    try:
-        return db.query(SedeModel).filter(SedeModel.id == sede_id).first() is not None
-    finally:
-        db.close()
+# Sentencias precompiladas: se construyen una sola vez al importar el módulo
+# y se ejecutan con parámetros, evitando reconstruir la expresión en cada llamada.
+_SEDE_EXISTS = select(exists().where(SedeModel.id == bindparam("id")))
+_PARTICIPANTE_EXISTS = select(exists().where(ParticipanteModel.id == bindparam("id")))
+_ACUDIENTE_EXISTS = select(exists().where(AcudienteModel.id_acudiente == bindparam("id")))
+
+_DOCUMENTO_PARTICIPANTE_EXISTS = select(exists().where(
+    ParticipanteModel.numero_documento == bindparam("documento")
+))
+_DOCUMENTO_PARTICIPANTE_EXISTS_EXCLUDE = select(exists().where(
+    ParticipanteModel.numero_documento == bindparam("documento"),
+    ParticipanteModel.id != bindparam("exclude_id")
+))
+
+_DOCUMENTO_ACUDIENTE_EXISTS = select(exists().where(
+    AcudienteModel.numero_documento == bindparam("documento")
+))
+_DOCUMENTO_ACUDIENTE_EXISTS_EXCLUDE = select(exists().where(
+    AcudienteModel.numero_documento == bindparam("documento"),
+    AcudienteModel.id_acudiente != bindparam("exclude_id")
+))
+
+_NOMBRE_SEDE_EXISTS = select(exists().where(SedeModel.nombre == bindparam("nombre")))
+_NOMBRE_SEDE_EXISTS_EXCLUDE = select(exists().where(
+    SedeModel.nombre == bindparam("nombre"),
+    SedeModel.id != bindparam("exclude_id")
+))
+
+_MENSUALIDAD_EXISTS = select(exists().where(
+    MensualidadModel.participant_id == bindparam("participant_id"),
+    MensualidadModel.mes == bindparam("mes"),
+    MensualidadModel.año == bindparam("anio")
+))
+_MENSUALIDAD_EXISTS_EXCLUDE = select(exists().where(
+    MensualidadModel.participant_id == bindparam("participant_id"),
+    MensualidadModel.mes == bindparam("mes"),
+    MensualidadModel.año == bindparam("anio"),
+    MensualidadModel.id != bindparam("exclude_id")
+))
+
+_ACUDIENTE_BELONGS = select(exists().where(
+    AcudienteModel.id_acudiente == bindparam("acudiente_id"),
+    AcudienteModel.id_participante == bindparam("participante_id")
+))
+
+# Validaciones de creación combinadas: varias condiciones en un solo round-trip
+# (la de participante trae además los datos de la sede que devuelve la respuesta)
+_VALIDATE_CREATE_PARTICIPANTE = select(
+    (~exists().where(ParticipanteModel.numero_documento == bindparam("documento"))).label("documento_ok"),
+    exists().where(SedeModel.id == bindparam("sede_id")).label("sede_exists"),
+    select(SedeModel.nombre).where(SedeModel.id == bindparam("sede_id")).scalar_subquery().label("sede_nombre"),
+    select(SedeModel.direccion).where(SedeModel.id == bindparam("sede_id")).scalar_subquery().label("sede_direccion")
+)
+_VALIDATE_CREATE_MENSUALIDAD = select(
+    exists().where(ParticipanteModel.id == bindparam("participant_id")).label("participante_exists"),
+    exists().where(AcudienteModel.id_acudiente == bindparam("acudiente_id")).label("acudiente_exists"),
+    (~exists().where(
+        MensualidadModel.participant_id == bindparam("participant_id"),
+        MensualidadModel.mes == bindparam("mes"),
+        MensualidadModel.año == bindparam("anio")
+    )).label("mensualidad_unica")
+)
+
+# Conteos de dependientes: COUNT(*) directo sobre la columna indexada, sin la
+# subconsulta con todas las columnas que genera Query.count()
+_PARTICIPANTE_DEPENDENCIES_COUNT = select(
+    select(func.count()).select_from(AcudienteModel)
+    .where(AcudienteModel.id_participante == bindparam("id"))
+    .scalar_subquery().label("acudientes"),
+    select(func.count()).select_from(MensualidadModel)
+    .where(MensualidadModel.participant_id == bindparam("id"))
+    .scalar_subquery().label("mensualidades")
+)
+_ACUDIENTE_MENSUALIDADES_COUNT = (
+    select(func.count()).select_from(MensualidadModel)
+    .where(MensualidadModel.id_acudiente == bindparam("id"))
+)
+_SEDE_PARTICIPANTES_COUNT = (
+    select(func.count()).select_from(ParticipanteModel)
+    .where(ParticipanteModel.id_sede == bindparam("id"))
+)
+
+
+def validate_sede_exists(db: Session, sede_id: int) -> bool:
+    """Valida que una sede exista (consulta directa: una verificación de integridad no usa la caché)"""
+    return db.execute(_SEDE_EXISTS, {"id": sede_id}).scalar()
 
 
-def validate_participante_exists(participante_id: int) -> bool:
+def validate_participante_exists(db: Session, participante_id: int) -> bool:
     """Valida que un participante exista"""
-    db = get_db_service().get_db()
-    try:
-        return db.query(ParticipanteModel).filter(ParticipanteModel.id == participante_id).first() is not None
-    finally:
-        db.close()
+    return db.execute(_PARTICIPANTE_EXISTS, {"id": participante_id}).scalar()
 
 
-def validate_acudiente_exists(acudiente_id: int) -> bool:
+def validate_acudiente_exists(db: Session, acudiente_id: int) -> bool:
     """Valida que un acudiente exista"""
-    db = get_db_service().get_db()
-    try:
-        return db.query(AcudienteModel).filter(AcudienteModel.id_acudiente == acudiente_id).first() is not None
-    finally:
-        db.close()
+    return db.execute(_ACUDIENTE_EXISTS, {"id": acudiente_id}).scalar()
 
 
-def validate_documento_unico_participante(documento: str, exclude_id: Optional[int] = None) -> bool:
+def validate_documento_unico_participante(db: Session, documento: str, exclude_id: Optional[int] = None) -> bool:
     """Valida que el documento de participante sea único"""
-    db = get_db_service().get_db()
-    try:
-        query = db.query(ParticipanteModel).filter(ParticipanteModel.numero_documento == documento)
-        if exclude_id:
-            query = query.filter(ParticipanteModel.id != exclude_id)
-        return query.first() is None
-    finally:
-        db.close()
+    if exclude_id:
+        return not db.execute(
+            _DOCUMENTO_PARTICIPANTE_EXISTS_EXCLUDE,
+            {"documento": documento, "exclude_id": exclude_id}
+        ).scalar()
+    return not db.execute(_DOCUMENTO_PARTICIPANTE_EXISTS, {"documento": documento}).scalar()
 
 
-def validate_documento_unico_acudiente(documento: str, exclude_id: Optional[int] = None) -> bool:
+def validate_documento_unico_acudiente(db: Session, documento: str, exclude_id: Optional[int] = None) -> bool:
     """Valida que el documento de acudiente sea único"""
-    db = get_db_service().get_db()
-    try:
-        query = db.query(AcudienteModel).filter(AcudienteModel.numero_documento == documento)
-        if exclude_id:
-            query = query.filter(AcudienteModel.id_acudiente != exclude_id)
-        return query.first() is None
-    finally:
-        db.close()
+    if exclude_id:
+        return not db.execute(
+            _DOCUMENTO_ACUDIENTE_EXISTS_EXCLUDE,
+            {"documento": documento, "exclude_id": exclude_id}
+        ).scalar()
+    return not db.execute(_DOCUMENTO_ACUDIENTE_EXISTS, {"documento": documento}).scalar()
 
 
-def validate_nombre_sede_unico(nombre: str, exclude_id: Optional[int] = None) -> bool:
+def validate_nombre_sede_unico(db: Session, nombre: str, exclude_id: Optional[int] = None) -> bool:
     """Valida que el nombre de sede sea único"""
-    db = get_db_service().get_db()
-    try:
-        query = db.query(SedeModel).filter(SedeModel.nombre == nombre)
-        if exclude_id:
-            query = query.filter(SedeModel.id != exclude_id)
-        return query.first() is None
-    finally:
-        db.close()
+    if exclude_id:
+        return not db.execute(
+            _NOMBRE_SEDE_EXISTS_EXCLUDE,
+            {"nombre": nombre, "exclude_id": exclude_id}
+        ).scalar()
+    return not db.execute(_NOMBRE_SEDE_EXISTS, {"nombre": nombre}).scalar()
 
 
-def validate_mensualidad_unica(participant_id: int, mes: int, año: int, exclude_id: Optional[int] = None) -> bool:
+def validate_mensualidad_unica(db: Session, participant_id: int, mes: int, año: int, exclude_id: Optional[int] = None) -> bool:
     """Valida que no exista otra mensualidad para el mismo participante, mes y año"""
-    db = get_db_service().get_db()
-    try:
-        query = db.query(MensualidadModel).filter(
-            MensualidadModel.participant_id == participant_id,
-            MensualidadModel.mes == mes,
-            MensualidadModel.año == año
-        )
-        if exclude_id:
-            query = query.filter(MensualidadModel.id != exclude_id)
-        return query.first() is None
-    finally:
-        db.close()
-
-
-def validate_acudiente_belongs_to_participante(acudiente_id: int, participante_id: int) -> bool:
+    params = {"participant_id": participant_id, "mes": mes, "anio": año}
+    if exclude_id:
+        params["exclude_id"] = exclude_id
+        return not db.execute(_MENSUALIDAD_EXISTS_EXCLUDE, params).scalar()
+    return not db.execute(_MENSUALIDAD_EXISTS, params).scalar()
+
+
+def validate_acudiente_belongs_to_participante(db: Session, acudiente_id: int, participante_id: int) -> bool:
     """Valida que el acudiente pertenezca al participante"""
-    db = get_db_service().get_db()
-    try:
-        acudiente = db.query(AcudienteModel).filter(
-            AcudienteModel.id_acudiente == acudiente_id,
-            AcudienteModel.id_participante == participante_id
-        ).first()
-        return acudiente is not None
-    finally:
-        db.close()
-
-
-def check_participante_has_dependencies(participante_id: int) -> Dict[str, Any]:
+    return db.execute(
+        _ACUDIENTE_BELONGS,
+        {"acudiente_id": acudiente_id, "participante_id": participante_id}
+    ).scalar()
+
+
+def validate_create_participante(db: Session, documento: str, sede_id: int) -> Dict[str, Any]:
+    """
+    Valida en una sola consulta que el documento sea único y que la sede exista.
+    Si la sede existe, "sede" trae su id, nombre y dirección (si no, es None).
+    """
+    row = db.execute(
+        _VALIDATE_CREATE_PARTICIPANTE,
+        {"documento": documento, "sede_id": sede_id}
+    ).one()
+    sede = None
+    if row.sede_exists:
+        sede = {"id": sede_id, "nombre": row.sede_nombre, "direccion": row.sede_direccion}
+    return {"documento_ok": row.documento_ok, "sede_exists": row.sede_exists, "sede": sede}
+
+
+def validate_create_mensualidad(
+    db: Session, participant_id: int, acudiente_id: Optional[int], mes: int, año: int
+) -> Dict[str, bool]:
+    """Valida en una sola consulta participante, acudiente (si se indica) y unicidad de la mensualidad"""
+    row = db.execute(
+        _VALIDATE_CREATE_MENSUALIDAD,
+        {"participant_id": participant_id, "acudiente_id": acudiente_id, "mes": mes, "anio": año}
+    ).one()
+    return {
+        "participante_exists": row.participante_exists,
+        # Sin acudiente no hay nada que validar sobre él
+        "acudiente_exists": row.acudiente_exists if acudiente_id else True,
+        "mensualidad_unica": row.mensualidad_unica
+    }
+
+
+def check_participante_has_dependencies(db: Session, participante_id: int) -> Dict[str, Any]:
     """Verifica si un participante tiene dependencias"""
-    db = get_db_service().get_db()
-    try:
-        acudientes_count = db.query(AcudienteModel).filter(AcudienteModel.id_participante == participante_id).count()
-        mensualidades_count = db.query(MensualidadModel).filter(MensualidadModel.participant_id == participante_id).count()
-
-        return {
-            "has_dependencies": acudientes_count > 0 or mensualidades_count > 0,
-            "details": {
-                "acudientes": acudientes_count,
-                "mensualidades": mensualidades_count
-            }
+    # Ambos conteos en un solo SELECT (un único round-trip)
+    row = db.execute(_PARTICIPANTE_DEPENDENCIES_COUNT, {"id": participante_id}).one()
+    acudientes_count = row.acudientes
+    mensualidades_count = row.mensualidades
+
+    return {
+        "has_dependencies": acudientes_count > 0 or mensualidades_count > 0,
+        "details": {
+            "acudientes": acudientes_count,
+            "mensualidades": mensualidades_count
         }
-    finally:
-        db.close()
+    }
 
 
-def check_acudiente_has_mensualidades(acudiente_id: int) -> Dict[str, Any]:
+def check_acudiente_has_mensualidades(db: Session, acudiente_id: int) -> Dict[str, Any]:
     """Verifica si un acudiente tiene mensualidades asociadas"""
-    db = get_db_service().get_db()
-    try:
-        mensualidades_count = db.query(MensualidadModel).filter(MensualidadModel.id_acudiente == acudiente_id).count()
-
-        return {
-            "has_dependencies": mensualidades_count > 0,
-            "details": {
-                "mensualidades": mensualidades_count
-            }
+    mensualidades_count = db.execute(_ACUDIENTE_MENSUALIDADES_COUNT, {"id": acudiente_id}).scalar()
+
+    return {
+        "has_dependencies": mensualidades_count > 0,
+        "details": {
+            "mensualidades": mensualidades_count
         }
-    finally:
-        db.close()
+    }
 
 
-def check_sede_has_participantes(sede_id: int) -> Dict[str, Any]:
+def check_sede_has_participantes(db: Session, sede_id: int) -> Dict[str, Any]:
     """Verifica si una sede tiene participantes asociados"""
-    db = get_db_service().get_db()
-    try:
-        participantes_count = db.query(ParticipanteModel).filter(ParticipanteModel.id_sede == sede_id).count()
-
-        return {
-            "has_dependencies": participantes_count > 0,
-            "details": {
-                "participantes": participantes_count
-            }
+    participantes_count = db.execute(_SEDE_PARTICIPANTES_COUNT, {"id": sede_id}).scalar()
+
+    return {
+        "has_dependencies": participantes_count > 0,
+        "details": {
+            "participantes": participantes_count
         }
-    finally:
-        db.close()
+    }
+
+
+# ============================================================================
+# Estadísticas del dashboard
+# ============================================================================
+
+# Los tres conteos como subconsultas escalares de un único SELECT (un round-trip)
+_DASHBOARD_COUNTS = select(
+    select(func.count()).select_from(ParticipanteModel).scalar_subquery().label("participantes"),
+    select(func.count()).select_from(AcudienteModel).scalar_subquery().label("acudientes"),
+    select(func.count()).select_from(MensualidadModel).scalar_subquery().label("mensualidades")
+)
+
+
+def get_dashboard_counts(db: Session) -> Dict[str, int]:
+    """Obtiene el total de participantes, acudientes y mensualidades en una sola consulta"""
+    return dict(db.execute(_DASHBOARD_COUNTS).one()._mapping)
 
 
 # ============================================================================
@@ -1,9 +1,20 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import os
 import logging
-from database_models import db_service, SedeModel, ParticipanteModel, AcudienteModel, UsuarioModel, MensualidadModel, SessionLocal
-from sqlalchemy.orm import Session
+import orjson
+from typing import Any, Dict, List, Optional, Tuple
+from database_models import db_service, SedeModel, AcudienteModel, UsuarioModel, MensualidadModel, SessionLocal, get_db
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, raiseload, selectinload
+from database import (
+    get_all_participantes_with_sede, get_dashboard_counts,
+    validate_create_mensualidad,
+    STATS_CACHE_TTL, get_cached_response, get_stale_response,
+    set_cached_response, invalidate_response_cache
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,23 +23,40 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Dashboard API - Corporación Todo por un Alma",
     description="API REST para gestionar participantes, acudientes, sedes y mensualidades",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Serialización con orjson (más rápida que json)
 )
 
-# Configurar CORS
-allowed_origins = os.getenv("ALLOWED_ORIGINS", "https://todoporunalma.org,https://www.todoporunalma.org").split(",")
-logger.info(f"CORS allowed origins: {allowed_origins}")
+# Configurar CORS: orígenes normalizados una sola vez; con un frozenset la
+# comprobación del origen en cada request es O(1)
+ALLOWED_ORIGINS = frozenset(
+    origin.strip()
+    for origin in os.getenv("ALLOWED_ORIGINS", "https://todoporunalma.org,https://www.todoporunalma.org").split(",")
+    if origin.strip()
+)
+logger.info("CORS allowed origins: %s", sorted(ALLOWED_ORIGINS))
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[origin.strip() for origin in allowed_origins],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-def get_db():
-    """Obtener sesión de base de datos"""
-    return SessionLocal()
+# ============================================================================
+# Paginación de listados
+# ============================================================================
+
+# Paginación por cursor opcional: ?limit=N&after_id=X devuelve hasta N filas con id > X.
+# Sin limit se devuelve el listado completo, como espera el frontend actual.
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+def _list_response(result: List[Dict[str, Any]], limit: Optional[int], id_key: str) -> Dict[str, Any]:
+    """Arma la respuesta de un listado; si se pidió una página incluye el cursor siguiente"""
+    response = {"data": result, "error": None}
+    if limit is not None:
+        response["next_after_id"] = result[-1][id_key] if len(result) == limit else None
+    return response
 
 @app.get("/")
 async def root():
@@ -45,201 +73,234 @@ async def test_endpoint():
     return {"test": "ok"}
 
 @app.get("/acudientes")
-async def get_acudientes():
-    """Obtiene la lista de todos los acudientes con información de participante"""
-    try:
-        db = get_db()
-        acudientes = db.query(AcudienteModel).all()
-
-        result = []
-        for a in acudientes:
-            participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == a.id_participante).first()
-            acudiente_data = {
-                "id_acudiente": a.id_acudiente,
-                "nombres": a.nombres,
-                "apellidos": a.apellidos,
-                "tipo_documento": a.tipo_documento,
-                "numero_documento": a.numero_documento,
-                "parentesco": a.parentesco,
-                "telefono": a.telefono,
-                "email": a.email,
-                "direccion": a.direccion,
-                "id_participante": a.id_participante,
-                "participante": {
-                    "id": participante.id,
-                    "nombres": participante.nombres,
-                    "apellidos": participante.apellidos
-                } if participante else None
-            }
-            result.append(acudiente_data)
-
-        return {"data": result, "error": None}
-    finally:
-        db.close()
+def get_acudientes(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Obtiene la lista de acudientes con información de participante"""
+    query = db.query(AcudienteModel).options(
+        selectinload(AcudienteModel.participante),
+        raiseload("*")  # Cualquier otra carga perezosa falla en vez de generar N+1
+    ).order_by(AcudienteModel.id_acudiente)
+    if after_id is not None:
+        query = query.filter(AcudienteModel.id_acudiente > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    acudientes = query.all()
+
+    result = []
+    for a in acudientes:
+        participante = a.participante
+        acudiente_data = {
+            "id_acudiente": a.id_acudiente,
+            "nombres": a.nombres,
+            "apellidos": a.apellidos,
+            "tipo_documento": a.tipo_documento,
+            "numero_documento": a.numero_documento,
+            "parentesco": a.parentesco,
+            "telefono": a.telefono,
+            "email": a.email,
+            "direccion": a.direccion,
+            "id_participante": a.id_participante,
+            "participante": {
+                "id": participante.id,
+                "nombres": participante.nombres,
+                "apellidos": participante.apellidos
+            } if participante else None
+        }
+        result.append(acudiente_data)
+
+    return _list_response(result, limit, "id_acudiente")
 
 @app.get("/sedes")
-async def get_sedes():
+def get_sedes(db: Session = Depends(get_db)):
     """Obtiene la lista de todas las sedes"""
+    cached = get_cached_response("sedes:all")
+    if cached is not None:
+        return {"data": cached, "error": None}
+
+    # Lectura directa de columnas (sin instanciar objetos ORM)
     try:
-        db = get_db()
-        sedes = db.query(SedeModel).all()
-
-        result = []
-        for s in sedes:
-            sede_data = {
-                "id": s.id,
-                "nombre": s.nombre,
-                "direccion": s.direccion,
-                "telefono": s.telefono,
-                "capacidad_maxima": s.capacidad_maxima,
-                "estado": s.estado,
-                "tipo": s.tipo
-            }
-            result.append(sede_data)
-
-        return {"data": result, "error": None}
-    finally:
-        db.close()
+        rows = db.execute(select(
+            SedeModel.id, SedeModel.nombre, SedeModel.direccion, SedeModel.telefono,
+            SedeModel.capacidad_maxima, SedeModel.estado, SedeModel.tipo
+        )).mappings().all()
+    except SQLAlchemyError:
+        # Las sedes casi no cambian: si la base de datos falla se sirve la última copia
+        stale = get_stale_response("sedes:all")
+        if stale is None:
+            raise
+        logger.warning("Database error in /sedes, serving cached data", exc_info=True)
+        return {"data": stale, "error": None}
+    result = [dict(r) for r in rows]
+
+    set_cached_response("sedes:all", result)
+    return {"data": result, "error": None}
 
 @app.get("/usuarios")
-async def get_usuarios():
+def get_usuarios(db: Session = Depends(get_db)):
     """Obtiene la lista de todos los usuarios"""
-    try:
-        db = get_db()
-        usuarios = db.query(UsuarioModel).all()
-
-        result = []
-        for u in usuarios:
-            usuario_data = {
-                "id_usuario": u.id_usuario,
-                "email": u.email,
-                "rol": u.rol
-            }
-            result.append(usuario_data)
-
-        return {"data": result, "error": None}
-    finally:
-        db.close()
+    cached = get_cached_response("usuarios:all")
+    if cached is not None:
+        return {"data": cached, "error": None}
+
+    rows = db.execute(select(
+        UsuarioModel.id_usuario, UsuarioModel.email, UsuarioModel.rol
+    )).mappings().all()
+    result = [dict(r) for r in rows]
+
+    set_cached_response("usuarios:all", result)
+    return {"data": result, "error": None}
 
 @app.get("/dashboard/stats")
-async def get_dashboard_stats():
+def get_dashboard_stats(db: Session = Depends(get_db)):
    """Obtiene estadísticas generales del dashboard"""
-   try:
-       db = get_db()
-       stats = {
-           "participantes": db.query(ParticipanteModel).count(),
-           "acudientes": db.query(AcudienteModel).count(),
-           "mensualidades": db.query(MensualidadModel).count()
-       }
+   stats = get_cached_response("stats")
+   if stats is not None:
        return {"data": stats, "error": None}
-   finally:
-       db.close()
+
+   stats = get_dashboard_counts(db)
+   set_cached_response("stats", stats, STATS_CACHE_TTL)
+   return {"data": stats, "error": None}
+
+# Cabeceras que no se escriben en los logs
+_SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "x-api-key"})
 
 @app.get("/participantes")
-async def get_participantes(request: Request):
-   """Obtiene la lista de todos los participantes con información de sede"""
-   logger.info(f"Request to /participantes from origin: {request.headers.get('origin')}")
-   logger.info(f"Request headers: {dict(request.headers)}")
+def get_participantes(
+   request: Request,
+   limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+   after_id: Optional[int] = None,
+   db: Session = Depends(get_db)
+):
+   """Obtiene la lista de participantes con información de sede"""
+   # Solo en DEBUG: evita armar el dict de cabeceras en cada request y no expone credenciales
+   if logger.isEnabledFor(logging.DEBUG):
+       logger.debug("Request to /participantes from origin: %s", request.headers.get("origin"))
+       logger.debug("Request headers: %s", {
+           k: ("***" if k in _SENSITIVE_HEADERS else v) for k, v in request.headers.items()
+       })
    try:
-       db = get_db()
-       participantes = db.query(ParticipanteModel).all()
-
-       result = []
-       for p in participantes:
-           sede = db.query(SedeModel).filter(SedeModel.id == p.id_sede).first()
-           participante_data = {
-               "id": p.id,
-               "nombres": p.nombres,
-               "apellidos": p.apellidos,
-               "tipo_documento": p.tipo_documento,
-               "numero_documento": p.numero_documento,
-               "fecha_nacimiento": p.fecha_nacimiento,
-               "genero": p.genero,
-               "fecha_ingreso": p.fecha_ingreso,
-               "estado": p.estado,
-               "id_sede": p.id_sede,
-               "telefono": p.telefono,
-               "sede": {
-                   "id": sede.id,
-                   "nombre": sede.nombre,
-                   "direccion": sede.direccion
-               } if sede else None
-           }
-           result.append(participante_data)
-
-       logger.info(f"Returning {len(result)} participantes")
-       return {"data": result, "error": None}
+       result = get_all_participantes_with_sede(db, after_id=after_id, limit=limit)
+       logger.debug("Returning %d participantes", len(result))
+       return _list_response(result, limit, "id")
    except Exception as e:
-       logger.error(f"Error in get_participantes: {str(e)}")
+       logger.error("Error in get_participantes: %s", e)
        raise
-   finally:
-       db.close()
+
+# Alias "valor"/"status" que duplican monto/estado, solo para el frontend anterior.
+# Por defecto no se envían; MENSUALIDADES_COMPAT_ALIASES=true los reactiva mientras
+# ese frontend no lea monto/estado.
+MENSUALIDADES_COMPAT_ALIASES = os.getenv("MENSUALIDADES_COMPAT_ALIASES", "false").lower() == "true"
+
+def _mensualidad_to_dict(m: MensualidadModel) -> Dict[str, Any]:
+    """Arma la fila del listado de mensualidades (participante y acudiente ya cargados)"""
+    participante = m.participante
+    acudiente = m.acudiente
+    monto = float(m.monto)
+    mensualidad_data = {
+        "id": m.id,
+        "participant_id": m.participant_id,
+        "id_acudiente": m.id_acudiente,
+        "mes": m.mes,
+        "año": m.año,
+        "monto": monto,
+        "estado": m.estado,
+        "metodo_pago": m.metodo_pago,
+        "fecha_pago": m.fecha_pago,
+        "observaciones": m.observaciones,
+        # Información del participante
+        "participant_name": f"{participante.nombres} {participante.apellidos}" if participante else "N/A",
+        "participant_documento": participante.numero_documento if participante else "N/A",
+        "sede_id": participante.id_sede if participante else None,
+        # Información del acudiente
+        "acudiente_name": f"{acudiente.nombres} {acudiente.apellidos}" if acudiente else "N/A",
+        "acudiente_documento": acudiente.numero_documento if acudiente else "N/A"
+    }
+    if MENSUALIDADES_COMPAT_ALIASES:
+        mensualidad_data["valor"] = monto
+        mensualidad_data["status"] = m.estado
+    return mensualidad_data
+
+# Participante y acudiente se cargan con una consulta IN por relación; cualquier
+# otra relación accedida lanza error en lugar de disparar una consulta por fila
+_MENSUALIDADES_LISTING = select(MensualidadModel).options(
+    selectinload(MensualidadModel.participante),
+    selectinload(MensualidadModel.acudiente),
+    raiseload("*")
+).order_by(MensualidadModel.id)
+
+MENSUALIDADES_STREAM_BATCH = int(os.getenv("MENSUALIDADES_STREAM_BATCH", "500"))
 
 @app.get("/mensualidades")
-async def get_mensualidades():
-    """Obtiene la lista de todas las mensualidades con información de participantes y acudientes"""
-    try:
-        db = get_db()
-        mensualidades = db.query(MensualidadModel).all()
-
-        result = []
-        for m in mensualidades:
-            # Obtener información del participante
-            participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == m.participant_id).first()
-            sede = db.query(SedeModel).filter(SedeModel.id == participante.id_sede).first() if participante else None
-
-            # Obtener información del acudiente (si existe)
-            acudiente = None
-            if m.id_acudiente:
-                acudiente = db.query(AcudienteModel).filter(AcudienteModel.id_acudiente == m.id_acudiente).first()
-
-            mensualidad_data = {
-                "id": m.id,
-                "participant_id": m.participant_id,
-                "id_acudiente": m.id_acudiente,
-                "mes": m.mes,
-                "año": m.año,
-                "monto": m.monto,
-                "valor": m.monto,  # Alias para compatibilidad con frontend
-                "estado": m.estado,
-                "status": m.estado,  # Alias para compatibilidad con frontend
-                "metodo_pago": m.metodo_pago,
-                "fecha_pago": m.fecha_pago,
-                "observaciones": m.observaciones,
-                # Información del participante
-                "participant_name": f"{participante.nombres} {participante.apellidos}" if participante else "N/A",
-                "participant_documento": participante.numero_documento if participante else "N/A",
-                "sede_id": participante.id_sede if participante else None,
-                # Información del acudiente
-                "acudiente_name": f"{acudiente.nombres} {acudiente.apellidos}" if acudiente else "N/A",
-                "acudiente_documento": acudiente.numero_documento if acudiente else "N/A"
-            }
-            result.append(mensualidad_data)
-
-        return {"data": result, "error": None}
-    finally:
-        db.close()
+def get_mensualidades(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Obtiene la lista de mensualidades con información de participantes y acudientes"""
+    stmt = _MENSUALIDADES_LISTING
+    if after_id is not None:
+        stmt = stmt.where(MensualidadModel.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = [_mensualidad_to_dict(m) for m in db.scalars(stmt)]
+    return _list_response(result, limit, "id")
+
+@app.get("/mensualidades/stream")
+def stream_mensualidades():
+    """Transmite las mensualidades como NDJSON (una por línea), leyendo por lotes"""
+    def generate():
+        # Sesión propia: debe seguir abierta mientras se envía la respuesta
+        db = SessionLocal()
+        try:
+            rows = db.scalars(_MENSUALIDADES_LISTING, execution_options={"yield_per": MENSUALIDADES_STREAM_BATCH})
+            for m in rows:
+                yield orjson.dumps(_mensualidad_to_dict(m)) + b"\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# Mensaje de error de una mensualidad repetida (mismo participante, mes y año)
+_MENSUALIDAD_DUPLICADA = "Ya existe una mensualidad para este participante en el mes y año especificados"
+
+def _is_duplicate_mensualidad(error: IntegrityError) -> bool:
+    """
+    Indica si el error viene de la restricción única (participant_id, mes, año):
+    PostgreSQL la nombra en el mensaje; SQLite reporta las columnas tras "UNIQUE constraint failed"
+    """
+    message = str(error.orig)
+    return (
+        "uq_mensualidad_pid_mes_year" in message
+        or message.startswith("UNIQUE constraint failed: mensualidades.participant_id")
+    )
 
 @app.post("/mensualidades")
-async def create_mensualidad(mensualidad_data: dict):
+def create_mensualidad(mensualidad_data: dict, db: Session = Depends(get_db)):
     """Crea una nueva mensualidad"""
     try:
-        db = get_db()
-
-        # Validar que no exista una mensualidad duplicada para el mismo participante, mes y año
-        existing = db.query(MensualidadModel).filter(
-            MensualidadModel.participant_id == mensualidad_data["participant_id"],
-            MensualidadModel.mes == mensualidad_data["mes"],
-            MensualidadModel.año == mensualidad_data["año"]
-        ).first()
-
-        if existing:
-            return {"data": None, "error": {"message": "Ya existe una mensualidad para este participante en el mes y año especificados"}}
+        # Validar en una sola consulta el participante, el acudiente (si se indica) y que no
+        # exista una mensualidad duplicada para el mismo participante, mes y año.
+        # Las bases de datos creadas sin create_all no tienen la restricción única, así que
+        # esta verificación es la que aplica la regla; el IntegrityError solo cubre carreras.
+        participant_id = mensualidad_data["participant_id"]
+        id_acudiente = mensualidad_data.get("id_acudiente")
+        checks = validate_create_mensualidad(
+            db, participant_id, id_acudiente, mensualidad_data["mes"], mensualidad_data["año"]
+        )
+        if not checks["participante_exists"]:
+            return {"data": None, "error": {"message": f"El participante con ID {participant_id} no existe"}}
+        if not checks["acudiente_exists"]:
+            return {"data": None, "error": {"message": f"El acudiente con ID {id_acudiente} no existe"}}
+        if not checks["mensualidad_unica"]:
+            return {"data": None, "error": {"message": _MENSUALIDAD_DUPLICADA}}
 
         # Crear nueva mensualidad
         nueva_mensualidad = MensualidadModel(
-            participant_id=mensualidad_data["participant_id"],
-            id_acudiente=mensualidad_data.get("id_acudiente"),
+            participant_id=participant_id,
+            id_acudiente=id_acudiente,
             mes=mensualidad_data["mes"],
             año=mensualidad_data["año"],
             monto=mensualidad_data["monto"],
@@ -249,58 +310,73 @@ async def create_mensualidad(mensualidad_data: dict):
             observaciones=mensualidad_data.get("observaciones")
         )
 
+        # Si otra petición insertó la misma mensualidad entre la verificación y el INSERT,
+        # la restricción única (donde exista) lo detecta
         db.add(nueva_mensualidad)
-        db.commit()
-        db.refresh(nueva_mensualidad)
-
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if _is_duplicate_mensualidad(e):
+                return {"data": None, "error": {"message": _MENSUALIDAD_DUPLICADA}}
+            raise
+        invalidate_response_cache("stats")
+
+        # El id ya viene del INSERT (RETURNING) y la sesión no expira al hacer commit:
+        # no hace falta un db.refresh (otro SELECT)
         return {"data": {"id": nueva_mensualidad.id, "message": "Mensualidad creada exitosamente"}, "error": None}
     except Exception as e:
         db.rollback()
         return {"data": None, "error": {"message": f"Error al crear mensualidad: {str(e)}"}}
-    finally:
-        db.close()
+
+# Columnas que un PUT puede modificar (se ignoran las claves desconocidas)
+_MENSUALIDAD_UPDATABLE_FIELDS = frozenset(
+    c.key for c in MensualidadModel.__table__.columns
+) - {"id", "created_at", "updated_at"}
 
 @app.put("/mensualidades/{mensualidad_id}")
-async def update_mensualidad(mensualidad_id: int, mensualidad_data: dict):
+def update_mensualidad(mensualidad_id: int, mensualidad_data: dict, db: Session = Depends(get_db)):
     """Actualiza una mensualidad existente"""
     try:
-        db = get_db()
-
-        # Buscar la mensualidad
-        mensualidad = db.query(MensualidadModel).filter(MensualidadModel.id == mensualidad_id).first()
-        if not mensualidad:
+        values = {k: v for k, v in mensualidad_data.items() if k in _MENSUALIDAD_UPDATABLE_FIELDS}
+        if not values:
+            # Nada que actualizar: solo confirmar que exista
+            if db.get(MensualidadModel, mensualidad_id) is None:
+                return {"data": None, "error": {"message": "Mensualidad no encontrada"}}
+            return {"data": {"id": mensualidad_id, "message": "Mensualidad actualizada exitosamente"}, "error": None}
+
+        # Un solo UPDATE: las claves foráneas y la restricción única (migración 001)
+        # rechazan un participante o acudiente inexistente y una mensualidad repetida
+        try:
+            result = db.execute(
+                update(MensualidadModel)
+                .where(MensualidadModel.id == mensualidad_id)
+                .values(**values)
+            )
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if _is_duplicate_mensualidad(e):
+                return {"data": None, "error": {"message": _MENSUALIDAD_DUPLICADA}}
+            raise
+
+        if result.rowcount == 0:
             return {"data": None, "error": {"message": "Mensualidad no encontrada"}}
 
-        # Validar que no exista una mensualidad duplicada si se cambian los datos únicos
-        if ("participant_id" in mensualidad_data or "mes" in mensualidad_data or "año" in mensualidad_data):
-            new_participant_id = mensualidad_data.get("participant_id", mensualidad.participant_id)
-            new_mes = mensualidad_data.get("mes", mensualidad.mes)
-            new_año = mensualidad_data.get("año", mensualidad.año)
-
-            existing = db.query(MensualidadModel).filter(
-                MensualidadModel.participant_id == new_participant_id,
-                MensualidadModel.mes == new_mes,
-                MensualidadModel.año == new_año,
-                MensualidadModel.id != mensualidad_id
-            ).first()
-
-            if existing:
-                return {"data": None, "error": {"message": "Ya existe una mensualidad para este participante en el mes y año especificados"}}
-
-        # Actualizar campos
-        for key, value in mensualidad_data.items():
-            if hasattr(mensualidad, key):
-                setattr(mensualidad, key, value)
-
-        db.commit()
+        invalidate_response_cache("stats")
 
-        return {"data": {"id": mensualidad.id, "message": "Mensualidad actualizada exitosamente"}, "error": None}
+        return {"data": {"id": mensualidad_id, "message": "Mensualidad actualizada exitosamente"}, "error": None}
     except Exception as e:
         db.rollback()
         return {"data": None, "error": {"message": f"Error al actualizar mensualidad: {str(e)}"}}
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8081)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8081,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
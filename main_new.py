@@ -1,7 +1,9 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from typing import List
-from sqlalchemy.orm import Session
+import os
+from sqlalchemy.orm import Session, joinedload
 
 from models import (
     Participante, ParticipanteCreate, ParticipanteUpdate,
@@ -9,11 +11,15 @@ from models import (
     Sede, SedeCreate, SedeUpdate,
     Usuario, UsuarioCreate, UsuarioUpdate,
     Mensualidad, MensualidadCreate, MensualidadUpdate,
-    ApiResponse, DashboardStats
+    ApiResponse
 )
 from database_models import (
     db_service, SedeModel, ParticipanteModel, AcudienteModel,
-    UsuarioModel, MensualidadModel, SessionLocal
+    UsuarioModel, MensualidadModel, get_db
+)
+from database import (
+    get_all_participantes_with_sede, get_dashboard_counts, validate_create_participante,
+    STATS_CACHE_TTL, get_cached_response, set_cached_response, invalidate_response_cache
 )
 
 # ============================================================================
@@ -23,7 +29,8 @@ from database_models import (
 app = FastAPI(
     title="Dashboard API - Corporación Todo por un Alma",
     description="API REST para gestionar participantes, acudientes, sedes y mensualidades",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Serialización con orjson (más rápida que json)
 )
 
 # Configuración de CORS
@@ -35,13 +42,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ============================================================================
-# Funciones auxiliares
-# ============================================================================
-
-def get_db():
-    """Obtener sesión de base de datos"""
-    return SessionLocal()
+# Las respuestas se arman con model_construct: los datos vienen de la base de datos
+# (ya validados al insertarse), así que no se vuelven a validar al construir el modelo.
+# Nunca usar model_construct con datos que vengan del cliente.
 
 # ============================================================================
 # Health Check Endpoint
@@ -57,160 +60,118 @@ async def health_check():
 # ============================================================================
 
 @app.get("/api/participantes", response_model=ApiResponse)
-async def get_participantes():
+def get_participantes(db: Session = Depends(get_db)):
     """Obtiene la lista de todos los participantes con información de sede"""
-    try:
-        db = get_db()
-        participantes = db.query(ParticipanteModel).all()
-
-        result = []
-        for p in participantes:
-            sede = db.query(SedeModel).filter(SedeModel.id == p.id_sede).first()
-            participante_data = {
-                "id": p.id,
-                "nombres": p.nombres,
-                "apellidos": p.apellidos,
-                "tipo_documento": p.tipo_documento,
-                "numero_documento": p.numero_documento,
-                "fecha_nacimiento": p.fecha_nacimiento,
-                "genero": p.genero,
-                "fecha_ingreso": p.fecha_ingreso,
-                "estado": p.estado,
-                "id_sede": p.id_sede,
-                "telefono": p.telefono,
-                "sede": {
-                    "id": sede.id,
-                    "nombre": sede.nombre,
-                    "direccion": sede.direccion
-                } if sede else None
-            }
-            result.append(participante_data)
-
-        return ApiResponse(data=result, error=None)
-    finally:
-        db.close()
+    result = get_all_participantes_with_sede(db)
+    return ApiResponse.model_construct(data=result, error=None)
 
 @app.get("/api/participantes/{id}", response_model=ApiResponse)
-async def get_participante(id: int):
+def get_participante(id: int, db: Session = Depends(get_db)):
     """Obtiene un participante por ID con información de sede"""
-    try:
-        db = get_db()
-        participante = db.query(ParticipanteModel).filter(ParticipanteModel.id == id).first()
-
-        if not participante:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Participante no encontrado"
-            )
-
-        sede = db.query(SedeModel).filter(SedeModel.id == participante.id_sede).first()
-        participante_data = {
-            "id": participante.id,
-            "nombres": participante.nombres,
-            "apellidos": participante.apellidos,
-            "tipo_documento": participante.tipo_documento,
-            "numero_documento": participante.numero_documento,
-            "fecha_nacimiento": participante.fecha_nacimiento,
-            "genero": participante.genero,
-            "fecha_ingreso": participante.fecha_ingreso,
-            "estado": participante.estado,
-            "id_sede": participante.id_sede,
-            "telefono": participante.telefono,
-            "sede": {
-                "id": sede.id,
-                "nombre": sede.nombre,
-                "direccion": sede.direccion
-            } if sede else None
-        }
-
-        return ApiResponse(data=participante_data, error=None)
-    finally:
-        db.close()
+    participante = db.get(ParticipanteModel, id, options=[joinedload(ParticipanteModel.sede)])
+
+    if not participante:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Participante no encontrado"
+        )
+
+    sede = participante.sede
+    participante_data = {
+        "id": participante.id,
+        "nombres": participante.nombres,
+        "apellidos": participante.apellidos,
+        "tipo_documento": participante.tipo_documento,
+        "numero_documento": participante.numero_documento,
+        "fecha_nacimiento": participante.fecha_nacimiento,
+        "genero": participante.genero,
+        "fecha_ingreso": participante.fecha_ingreso,
+        "estado": participante.estado,
+        "id_sede": participante.id_sede,
+        "telefono": participante.telefono,
+        "sede": {
+            "id": sede.id,
+            "nombre": sede.nombre,
+            "direccion": sede.direccion
+        } if sede else None
+    }
+
+    return ApiResponse.model_construct(data=participante_data, error=None)
 
 @app.post("/api/participantes", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
-async def create_participante(participante: ParticipanteCreate):
+def create_participante(participante: ParticipanteCreate, db: Session = Depends(get_db)):
     """Crea un nuevo participante"""
-    try:
-        db = get_db()
-
-        # Validar que la sede exista
-        sede = db.query(SedeModel).filter(SedeModel.id == participante.id_sede).first()
-        if not sede:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"La sede con ID {participante.id_sede} no existe"
-            )
-
-        # Validar que el documento sea único
-        existing = db.query(ParticipanteModel).filter(
-            ParticipanteModel.numero_documento == participante.numero_documento
-        ).first()
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Ya existe un participante con el documento {participante.numero_documento}"
-            )
-
-        # Crear el participante
-        db_participante = ParticipanteModel(
-            nombres=participante.nombres,
-            apellidos=participante.apellidos,
-            tipo_documento=participante.tipo_documento,
-            numero_documento=participante.numero_documento,
-            fecha_nacimiento=participante.fecha_nacimiento,
-            genero=participante.genero,
-            fecha_ingreso=participante.fecha_ingreso,
-            estado=participante.estado,
-            id_sede=participante.id_sede,
-            telefono=participante.telefono
+    # Validar en una sola consulta que la sede exista y que el documento sea único
+    checks = validate_create_participante(db, participante.numero_documento, participante.id_sede)
+    if not checks["sede_exists"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La sede con ID {participante.id_sede} no existe"
         )
 
-        db.add(db_participante)
-        db.commit()
-        db.refresh(db_participante)
-
-        # Retornar con información de sede
-        participante_data = {
-            "id": db_participante.id,
-            "nombres": db_participante.nombres,
-            "apellidos": db_participante.apellidos,
-            "tipo_documento": db_participante.tipo_documento,
-            "numero_documento": db_participante.numero_documento,
-            "fecha_nacimiento": db_participante.fecha_nacimiento,
-            "genero": db_participante.genero,
-            "fecha_ingreso": db_participante.fecha_ingreso,
-            "estado": db_participante.estado,
-            "id_sede": db_participante.id_sede,
-            "telefono": db_participante.telefono,
-            "sede": {
-                "id": sede.id,
-                "nombre": sede.nombre,
-                "direccion": sede.direccion
-            }
-        }
-
-        return ApiResponse(data=participante_data, error=None)
-    finally:
-        db.close()
+    if not checks["documento_ok"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe un participante con el documento {participante.numero_documento}"
+        )
+
+    # Crear el participante
+    db_participante = ParticipanteModel(
+        nombres=participante.nombres,
+        apellidos=participante.apellidos,
+        tipo_documento=participante.tipo_documento,
+        numero_documento=participante.numero_documento,
+        fecha_nacimiento=participante.fecha_nacimiento,
+        genero=participante.genero,
+        fecha_ingreso=participante.fecha_ingreso,
+        estado=participante.estado,
+        id_sede=participante.id_sede,
+        telefono=participante.telefono
+    )
+
+    db.add(db_participante)
+    db.commit()
+    invalidate_response_cache("stats")
+
+    # Retornar con información de sede (los atributos siguen cargados tras el commit,
+    # sin necesidad de refrescar desde la base de datos)
+    participante_data = {
+        "id": db_participante.id,
+        "nombres": db_participante.nombres,
+        "apellidos": db_participante.apellidos,
+        "tipo_documento": db_participante.tipo_documento,
+        "numero_documento": db_participante.numero_documento,
+        "fecha_nacimiento": db_participante.fecha_nacimiento,
+        "genero": db_participante.genero,
+        "fecha_ingreso": db_participante.fecha_ingreso,
+        "estado": db_participante.estado,
+        "id_sede": db_participante.id_sede,
+        "telefono": db_participante.telefono,
+        "sede": checks["sede"]
+    }
+
+    return ApiResponse.model_construct(data=participante_data, error=None)
 
 # ============================================================================
 # Dashboard Stats
 # ============================================================================
 
 @app.get("/api/dashboard/stats", response_model=ApiResponse)
-async def get_dashboard_stats():
+def get_dashboard_stats(db: Session = Depends(get_db)):
     """Obtiene estadísticas generales del dashboard"""
-    try:
-        db = get_db()
-        stats = DashboardStats(
-            participantes=db.query(ParticipanteModel).count(),
-            acudientes=db.query(AcudienteModel).count(),
-            mensualidades=db.query(MensualidadModel).count()
-        )
-        return ApiResponse(data=stats.model_dump(), error=None)
-    finally:
-        db.close()
+    stats = get_cached_response("stats")
+    if stats is None:
+        stats = get_dashboard_counts(db)
+        set_cached_response("stats", stats, STATS_CACHE_TTL)
+    return ApiResponse.model_construct(data=stats, error=None)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8081)
\ No newline at end of file
+    uvicorn.run(
+        "main_new:app",
+        host="0.0.0.0",
+        port=8081,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
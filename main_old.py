@@ -1,6 +1,12 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import ORJSONResponse
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+import hashlib
+import itertools
+import time
+import orjson
 
 from models import (
     Participante, ParticipanteCreate, ParticipanteUpdate,
@@ -10,40 +16,37 @@ from models import (
     Mensualidad, MensualidadCreate, MensualidadUpdate,
     ApiResponse, DashboardStats
 )
-from database import (
-    db_service,
-    validate_sede_exists,
-    validate_documento_unico_participante,
-    validate_documento_unico_acudiente,
-    validate_participante_exists,
-    validate_acudiente_exists,
-    validate_nombre_sede_unico,
-    validate_mensualidad_unica,
-    validate_acudiente_belongs_to_participante,
-    check_participante_has_dependencies,
-    check_acudiente_has_mensualidades,
-    check_sede_has_participantes,
-    get_participante_with_sede,
-    get_acudiente_with_participante,
-    get_mensualidad_with_relations,
-    get_all_mensualidades_with_relations
-)
+from database import db_service
 from services import (
-    validate_sede_exists,
     validate_documento_unico_participante,
     validate_documento_unico_acudiente,
-    validate_participante_exists,
-    validate_acudiente_exists,
     validate_nombre_sede_unico,
     validate_mensualidad_unica,
     validate_acudiente_belongs_to_participante,
+    validate_email_unico_usuario,
     check_participante_has_dependencies,
     check_acudiente_has_mensualidades,
     check_sede_has_participantes,
     get_participante_with_sede,
     get_acudiente_with_participante,
+    get_all_acudientes_with_participante,
+    get_acudientes_of_participante,
     get_mensualidad_with_relations,
-    get_all_mensualidades_with_relations
+    get_all_mensualidades_with_relations,
+    get_mensualidades_of_participante,
+    index_participante,
+    unindex_participante,
+    index_acudiente,
+    unindex_acudiente,
+    index_mensualidad,
+    unindex_mensualidad,
+    index_sede,
+    unindex_sede,
+    index_usuario,
+    unindex_usuario,
+    participantes_by_sede,
+    mensualidades_by_participante,
+    mensualidades_by_acudiente
 )
 
 # ============================================================================
@@ -53,7 +56,8 @@ from services import (
 app = FastAPI(
     title="Dashboard API - Corporación Todo por un Alma",
     description="API REST para gestionar participantes, acudientes, sedes y mensualidades",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Serialización con orjson (más rápida que json)
 )
 
 # Configuración de CORS
@@ -65,6 +69,140 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Manejador único de errores inesperados: las HTTPException conservan su propio
+# manejador y cualquier otra excepción se responde con el formato de ApiResponse.
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    return ORJSONResponse(
+        {"data": None, "error": {"message": str(exc)}},
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
+
+# ============================================================================
+# Errores Frecuentes
+# ============================================================================
+
+# Los 404 con mensaje fijo se crean una sola vez y se reutilizan. Se lanzan con
+# with_traceback(None) para que el traceback no se acumule entre lanzamientos.
+PARTICIPANTE_404 = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Participante no encontrado")
+ACUDIENTE_404 = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Acudiente no encontrado")
+SEDE_404 = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sede no encontrada")
+MENSUALIDAD_404 = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mensualidad no encontrada")
+USUARIO_404 = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+
+# ============================================================================
+# Generación de IDs
+# ============================================================================
+
+# Un iterador por entidad que continúa desde el mayor ID existente; next() es una
+# sola operación atómica bajo el GIL, sin leer y reescribir un contador compartido.
+_id_gen = {
+    "participantes": itertools.count(max(participantes_db, default=0) + 1),
+    "acudientes": itertools.count(max(acudientes_db, default=0) + 1),
+    "sedes": itertools.count(max(sedes_db, default=0) + 1),
+    "mensualidades": itertools.count(max(mensualidades_db, default=0) + 1),
+    "usuarios": itertools.count(max(usuarios_db, default=0) + 1)
+}
+
+# ============================================================================
+# Utilidades
+# ============================================================================
+
+def _set_fields(model: BaseModel) -> Dict[str, Any]:
+    """
+    Campos enviados explícitamente en un modelo de actualización. Equivale a
+    model_dump(exclude_unset=True) para estos modelos (solo valores escalares),
+    leyendo model_fields_set directamente en lugar de serializar el modelo.
+    """
+    return {key: getattr(model, key) for key in model.model_fields_set}
+
+# ============================================================================
+# Vista Denormalizada de Mensualidades
+# ============================================================================
+
+# Cada mensualidad con participante, sede y acudiente ya resueltos. Se construye al
+# arrancar y se actualiza en cada escritura, así las lecturas solo devuelven el dict.
+mensualidades_view: Dict[int, dict] = {}
+
+
+def _rebuild_mensualidad_view(id: int) -> None:
+    """Recalcula (o elimina) la entrada de una mensualidad en la vista"""
+    mensualidad = get_mensualidad_with_relations(id)
+    if mensualidad is None:
+        mensualidades_view.pop(id, None)
+    else:
+        mensualidades_view[id] = mensualidad
+    invalidate_list_snapshot("mensualidades")
+
+
+def _rebuild_mensualidades_view_for(ids: Iterable[int]) -> None:
+    """
+    Recalcula solo las entradas indicadas: las mensualidades de un participante,
+    de un acudiente o de los participantes de una sede que se acaba de editar
+    """
+    refreshed = False
+    for id in ids:
+        mensualidades_view[id] = get_mensualidad_with_relations(id)
+        refreshed = True
+    if refreshed:
+        invalidate_list_snapshot("mensualidades")
+
+
+def _rebuild_mensualidades_view() -> None:
+    """Recalcula la vista completa (al arrancar)"""
+    global mensualidades_view
+    mensualidades_view = {
+        mensualidad["id"]: mensualidad
+        for mensualidad in get_all_mensualidades_with_relations()
+    }
+    invalidate_list_snapshot("mensualidades")
+
+
+@app.on_event("startup")
+async def build_mensualidades_view():
+    for usuario in usuarios_db.values():
+        index_usuario(usuario)
+    _rebuild_mensualidades_view()
+
+# ============================================================================
+# Snapshots de Listados
+# ============================================================================
+
+# Los listados de sedes, usuarios y mensualidades (desde su vista) se serializan una
+# vez (en la primera lectura tras cada escritura) junto con su ETag; los GET siguientes
+# devuelven los mismos bytes, o un 304 sin cuerpo si el cliente ya tiene esa versión
+# (If-None-Match).
+CLIENT_CACHE_CONTROL = "private, max-age=5"
+_list_snapshots: Dict[str, Tuple[str, bytes]] = {}
+
+
+def _etag(body: bytes) -> str:
+    """ETag (entre comillas, como exige HTTP) a partir del cuerpo serializado"""
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _cached_json_response(request: Request, etag: str, body: bytes) -> Response:
+    """Respuesta JSON ya serializada con ETag y Cache-Control, o 304 si no cambió"""
+    headers = {"ETag": etag, "Cache-Control": CLIENT_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _list_snapshot(entity: str, store: Dict[int, dict]) -> Tuple[str, bytes]:
+    """Devuelve (etag, cuerpo) del listado de una entidad, construyéndolo si hace falta"""
+    snapshot = _list_snapshots.get(entity)
+    if snapshot is None:
+        body = orjson.dumps({"data": tuple(store.values()), "error": None})
+        snapshot = _list_snapshots[entity] = (_etag(body), body)
+    return snapshot
+
+
+def invalidate_list_snapshot(entity: str) -> None:
+    """Descarta el snapshot del listado de una entidad tras una escritura"""
+    _list_snapshots.pop(entity, None)
+
 # ============================================================================
 # Health Check Endpoint
 # ============================================================================
@@ -74,973 +212,698 @@ async def health_check():
     """Health check endpoint para verificar que el servidor está funcionando"""
     return {"status": "ok", "message": "API is running"}
 
+# ============================================================================
+# Dashboard Stats
+# ============================================================================
+
+# El dashboard consulta las estadísticas cada pocos segundos: se guarda la respuesta
+# ya serializada durante un intervalo corto y se descarta al crear o eliminar registros.
+STATS_CACHE_TTL = 1.0
+_stats_cache: Optional[Tuple[float, str, bytes]] = None
+
+
+def invalidate_stats_cache() -> None:
+    """Descarta la respuesta cacheada de estadísticas"""
+    global _stats_cache
+    _stats_cache = None
+
+
+@app.get("/api/dashboard/stats")
+async def get_dashboard_stats(request: Request):
+    """Obtiene estadísticas generales del dashboard"""
+    global _stats_cache
+    now = time.monotonic()
+    if _stats_cache is not None and now - _stats_cache[0] < STATS_CACHE_TTL:
+        return _cached_json_response(request, _stats_cache[1], _stats_cache[2])
+    
+    stats = DashboardStats(
+        participantes=len(participantes_db),
+        acudientes=len(acudientes_db),
+        mensualidades=len(mensualidades_db)
+    )
+    
+    body = orjson.dumps({"data": stats.model_dump(), "error": None})
+    _stats_cache = (now, _etag(body), body)
+    return _cached_json_response(request, _stats_cache[1], body)
+
+
 # ============================================================================
 # Endpoints de Participantes
 # ============================================================================
 
-@app.get("/api/participantes", response_model=ApiResponse)
+@app.get("/api/participantes")
 async def get_participantes():
     """Obtiene la lista de todos los participantes con información de sede"""
-    try:
-        participantes = []
-        for id_participante in participantes_db.keys():
-            participante = get_participante_with_sede(id_participante)
-            if participante:
-                participantes.append(participante)
-        
-        return ApiResponse(data=participantes, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener participantes: {str(e)}"}
-        )
+    participantes = []
+    for id_participante in participantes_db.keys():
+        participante = get_participante_with_sede(id_participante)
+        if participante:
+            participantes.append(participante)
+    
+    return {"data": participantes, "error": None}
 
 
-@app.get("/api/participantes/{id}", response_model=ApiResponse)
+@app.get("/api/participantes/{id}")
 async def get_participante(id: int):
     """Obtiene un participante por ID con información de sede"""
-    try:
-        participante = get_participante_with_sede(id)
-        
-        if not participante:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Participante no encontrado"
-            )
-        
-        return ApiResponse(data=participante, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener participante: {str(e)}"}
-        )
+    participante = get_participante_with_sede(id)
+    
+    if not participante:
+        raise PARTICIPANTE_404.with_traceback(None)
+    
+    return {"data": participante, "error": None}
 
 
 @app.post("/api/participantes", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
 async def create_participante(participante: ParticipanteCreate):
     """Crea un nuevo participante"""
-    try:
-        # Validar que la sede exista
-        if not validate_sede_exists(participante.id_sede):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"La sede con ID {participante.id_sede} no existe"
-            )
-        
-        # Validar que el documento sea único
-        if not validate_documento_unico_participante(participante.numero_documento):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Ya existe un participante con el documento {participante.numero_documento}"
-            )
-        
-        # Generar nuevo ID
-        new_id = counters["participantes"] + 1
-        counters["participantes"] = new_id
-        
-        # Crear el participante
-        participante_dict = participante.model_dump()
-        participante_dict["id"] = new_id
-        
-        participantes_db[new_id] = participante_dict
-        
-        # Retornar con información de sede
-        participante_created = get_participante_with_sede(new_id)
-        
-        return ApiResponse(data=participante_created, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al crear participante: {str(e)}"}
-        )
+    # Validar que la sede exista
+    if participante.id_sede not in sedes_db:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La sede con ID {participante.id_sede} no existe"
+        )
+    
+    # Validar que el documento sea único
+    if not validate_documento_unico_participante(participante.numero_documento):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe un participante con el documento {participante.numero_documento}"
+        )
+    
+    # Generar nuevo ID
+    new_id = next(_id_gen["participantes"])
+    
+    # Crear el participante
+    participante_dict = {**participante.__dict__, "id": new_id}
+    
+    participantes_db[new_id] = participante_dict
+    index_participante(participante_dict)
+    invalidate_stats_cache()
+    
+    # Retornar con información de sede
+    participante_created = get_participante_with_sede(new_id)
+    
+    return {"data": participante_created, "error": None}
 
 
 @app.put("/api/participantes/{id}", response_model=ApiResponse)
 async def update_participante(id: int, participante_update: ParticipanteUpdate):
     """Actualiza un participante existente"""
-    try:
-        # Verificar que el participante exista
-        if id not in participantes_db:
+    # Verificar que el participante exista
+    if id not in participantes_db:
+        raise PARTICIPANTE_404.with_traceback(None)
+    
+    participante_actual = participantes_db[id]
+    update_data = _set_fields(participante_update)
+    
+    # Validar sede si se está actualizando
+    if "id_sede" in update_data:
+        if update_data["id_sede"] not in sedes_db:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Participante no encontrado"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La sede con ID {update_data['id_sede']} no existe"
             )
-        
-        participante_actual = participantes_db[id]
-        update_data = participante_update.model_dump(exclude_unset=True)
-        
-        # Validar sede si se está actualizando
-        if "id_sede" in update_data:
-            if not validate_sede_exists(update_data["id_sede"]):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"La sede con ID {update_data['id_sede']} no existe"
-                )
-        
-        # Validar documento único si se está actualizando
-        if "numero_documento" in update_data:
-            if not validate_documento_unico_participante(
-                update_data["numero_documento"], 
-                exclude_id=id
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Ya existe un participante con el documento {update_data['numero_documento']}"
-                )
-        
-        # Actualizar campos
-        for key, value in update_data.items():
-            participante_actual[key] = value
-        
-        participantes_db[id] = participante_actual
-        
-        # Retornar con información de sede
-        participante_updated = get_participante_with_sede(id)
-        
-        return ApiResponse(data=participante_updated, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al actualizar participante: {str(e)}"}
-        )
+    
+    # Validar documento único si se está actualizando
+    if "numero_documento" in update_data:
+        if not validate_documento_unico_participante(
+            update_data["numero_documento"], 
+            exclude_id=id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Ya existe un participante con el documento {update_data['numero_documento']}"
+            )
+    
+    # Actualizar campos en una copia nueva (reindexando por si cambia el documento)
+    unindex_participante(participante_actual)
+    participante_actual = {**participante_actual, **update_data}
+    
+    participantes_db[id] = participante_actual
+    index_participante(participante_actual)
+    _rebuild_mensualidades_view_for(mensualidades_by_participante.get(id, ()))
+    
+    # Retornar con información de sede
+    participante_updated = get_participante_with_sede(id)
+    
+    return {"data": participante_updated, "error": None}
 
 
 @app.delete("/api/participantes/{id}", response_model=ApiResponse)
 async def delete_participante(id: int):
     """Elimina un participante si no tiene dependencias"""
-    try:
-        # Verificar que el participante exista
-        if id not in participantes_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Participante no encontrado"
-            )
-        
-        # Verificar dependencias
-        dependencies = check_participante_has_dependencies(id)
-        if dependencies["has_dependencies"]:
-            details = dependencies["details"]
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"No se puede eliminar el participante porque tiene {details['acudientes']} acudiente(s) y {details['mensualidades']} mensualidad(es) asociadas"
-            )
-        
-        # Eliminar participante
-        deleted_participante = participantes_db.pop(id)
-        
-        return ApiResponse(
-            data={"message": "Participante eliminado exitosamente", "id": id},
-            error=None
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al eliminar participante: {str(e)}"}
-        )
+    # Verificar que el participante exista
+    if id not in participantes_db:
+        raise PARTICIPANTE_404.with_traceback(None)
+    
+    # Verificar dependencias
+    dependencies = check_participante_has_dependencies(id)
+    if dependencies["has_dependencies"]:
+        details = dependencies["details"]
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No se puede eliminar el participante porque tiene {details['acudientes']} acudiente(s) y {details['mensualidades']} mensualidad(es) asociadas"
+        )
+    
+    # Eliminar participante
+    deleted_participante = participantes_db.pop(id)
+    unindex_participante(deleted_participante)
+    invalidate_stats_cache()
+    
+    return {
+        "data": {"message": "Participante eliminado exitosamente", "id": id},
+        "error": None
+    }
 
 
 # ============================================================================
 # Endpoints de Acudientes
 # ============================================================================
 
-@app.get("/api/acudientes", response_model=ApiResponse)
+@app.get("/api/acudientes")
 async def get_acudientes():
     """Obtiene la lista de todos los acudientes"""
-    try:
-        acudientes = []
-        for id_acudiente in acudientes_db.keys():
-            acudiente = get_acudiente_with_participante(id_acudiente)
-            if acudiente:
-                acudientes.append(acudiente)
-        
-        return ApiResponse(data=acudientes, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener acudientes: {str(e)}"}
-        )
+    acudientes = get_all_acudientes_with_participante()
+    
+    return {"data": acudientes, "error": None}
 
 
-@app.get("/api/acudientes/{id}", response_model=ApiResponse)
+@app.get("/api/acudientes/{id}")
 async def get_acudiente(id: int):
     """Obtiene un acudiente por ID"""
-    try:
-        acudiente = get_acudiente_with_participante(id)
-        
-        if not acudiente:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Acudiente no encontrado"
-            )
-        
-        return ApiResponse(data=acudiente, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener acudiente: {str(e)}"}
-        )
+    acudiente = get_acudiente_with_participante(id)
+    
+    if not acudiente:
+        raise ACUDIENTE_404.with_traceback(None)
+    
+    return {"data": acudiente, "error": None}
 
 
-@app.get("/api/acudientes/participante/{id_participante}", response_model=ApiResponse)
+@app.get("/api/acudientes/participante/{id_participante}")
 async def get_acudientes_by_participante(id_participante: int):
     """Obtiene todos los acudientes de un participante específico"""
-    try:
-        # Verificar que el participante exista
-        if not validate_participante_exists(id_participante):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Participante con ID {id_participante} no encontrado"
-            )
-        
-        # Filtrar acudientes por participante
-        acudientes = []
-        for acudiente in acudientes_db.values():
-            if acudiente["id_participante"] == id_participante:
-                acudientes.append(acudiente)
-        
-        return ApiResponse(data=acudientes, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener acudientes del participante: {str(e)}"}
+    # Verificar que el participante exista
+    if id_participante not in participantes_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Participante con ID {id_participante} no encontrado"
         )
+    
+    # Acudientes del participante (índice por participante, sin recorrer todos)
+    acudientes = get_acudientes_of_participante(id_participante)
+    
+    return {"data": acudientes, "error": None}
 
 
 @app.post("/api/acudientes", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
 async def create_acudiente(acudiente: AcudienteCreate):
     """Crea un nuevo acudiente"""
-    try:
-        # Validar que el participante exista
-        if not validate_participante_exists(acudiente.id_participante):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El participante con ID {acudiente.id_participante} no existe"
-            )
-        
-        # Validar que el documento sea único
-        if not validate_documento_unico_acudiente(acudiente.numero_documento):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Ya existe un acudiente con el documento {acudiente.numero_documento}"
-            )
-        
-        # Generar nuevo ID
-        new_id = counters["acudientes"] + 1
-        counters["acudientes"] = new_id
-        
-        # Crear el acudiente
-        acudiente_dict = acudiente.model_dump()
-        acudiente_dict["id_acudiente"] = new_id
-        
-        acudientes_db[new_id] = acudiente_dict
-        
-        # Retornar con información del participante
-        acudiente_created = get_acudiente_with_participante(new_id)
-        
-        return ApiResponse(data=acudiente_created, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al crear acudiente: {str(e)}"}
-        )
+    # Validar que el participante exista
+    if acudiente.id_participante not in participantes_db:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El participante con ID {acudiente.id_participante} no existe"
+        )
+    
+    # Validar que el documento sea único
+    if not validate_documento_unico_acudiente(acudiente.numero_documento):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe un acudiente con el documento {acudiente.numero_documento}"
+        )
+    
+    # Generar nuevo ID
+    new_id = next(_id_gen["acudientes"])
+    
+    # Crear el acudiente
+    acudiente_dict = {**acudiente.__dict__, "id_acudiente": new_id}
+    
+    acudientes_db[new_id] = acudiente_dict
+    index_acudiente(acudiente_dict)
+    invalidate_stats_cache()
+    
+    # Retornar con información del participante
+    acudiente_created = get_acudiente_with_participante(new_id)
+    
+    return {"data": acudiente_created, "error": None}
 
 
 @app.put("/api/acudientes/{id}", response_model=ApiResponse)
 async def update_acudiente(id: int, acudiente_update: AcudienteUpdate):
     """Actualiza un acudiente existente"""
-    try:
-        # Verificar que el acudiente exista
-        if id not in acudientes_db:
+    # Verificar que el acudiente exista
+    if id not in acudientes_db:
+        raise ACUDIENTE_404.with_traceback(None)
+    
+    acudiente_actual = acudientes_db[id]
+    update_data = _set_fields(acudiente_update)
+    
+    # Validar participante si se está actualizando
+    if "id_participante" in update_data:
+        if update_data["id_participante"] not in participantes_db:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Acudiente no encontrado"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El participante con ID {update_data['id_participante']} no existe"
             )
-        
-        acudiente_actual = acudientes_db[id]
-        update_data = acudiente_update.model_dump(exclude_unset=True)
-        
-        # Validar participante si se está actualizando
-        if "id_participante" in update_data:
-            if not validate_participante_exists(update_data["id_participante"]):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El participante con ID {update_data['id_participante']} no existe"
-                )
-        
-        # Validar documento único si se está actualizando
-        if "numero_documento" in update_data:
-            if not validate_documento_unico_acudiente(
-                update_data["numero_documento"], 
-                exclude_id=id
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Ya existe un acudiente con el documento {update_data['numero_documento']}"
-                )
-        
-        # Actualizar campos
-        for key, value in update_data.items():
-            acudiente_actual[key] = value
-        
-        acudientes_db[id] = acudiente_actual
-        
-        # Retornar con información del participante
-        acudiente_updated = get_acudiente_with_participante(id)
-        
-        return ApiResponse(data=acudiente_updated, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al actualizar acudiente: {str(e)}"}
-        )
+    
+    # Validar documento único si se está actualizando
+    if "numero_documento" in update_data:
+        if not validate_documento_unico_acudiente(
+            update_data["numero_documento"], 
+            exclude_id=id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Ya existe un acudiente con el documento {update_data['numero_documento']}"
+            )
+    
+    # Actualizar campos en una copia nueva (reindexando por si cambia el participante)
+    unindex_acudiente(acudiente_actual)
+    acudiente_actual = {**acudiente_actual, **update_data}
+    
+    acudientes_db[id] = acudiente_actual
+    index_acudiente(acudiente_actual)
+    _rebuild_mensualidades_view_for(mensualidades_by_acudiente.get(id, ()))
+    
+    # Retornar con información del participante
+    acudiente_updated = get_acudiente_with_participante(id)
+    
+    return {"data": acudiente_updated, "error": None}
 
 
 @app.delete("/api/acudientes/{id}", response_model=ApiResponse)
 async def delete_acudiente(id: int):
     """Elimina un acudiente si no tiene dependencias"""
-    try:
-        # Verificar que el acudiente exista
-        if id not in acudientes_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Acudiente no encontrado"
-            )
-        
-        # Verificar dependencias
-        dependencies = check_acudiente_has_mensualidades(id)
-        if dependencies["has_dependencies"]:
-            details = dependencies["details"]
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"No se puede eliminar el acudiente porque tiene {details['mensualidades']} mensualidad(es) asociadas"
-            )
-        
-        # Eliminar acudiente
-        deleted_acudiente = acudientes_db.pop(id)
-        
-        return ApiResponse(
-            data={"message": "Acudiente eliminado exitosamente", "id": id},
-            error=None
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al eliminar acudiente: {str(e)}"}
-        )
+    # Verificar que el acudiente exista
+    if id not in acudientes_db:
+        raise ACUDIENTE_404.with_traceback(None)
+    
+    # Verificar dependencias
+    dependencies = check_acudiente_has_mensualidades(id)
+    if dependencies["has_dependencies"]:
+        details = dependencies["details"]
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No se puede eliminar el acudiente porque tiene {details['mensualidades']} mensualidad(es) asociadas"
+        )
+    
+    # Eliminar acudiente
+    deleted_acudiente = acudientes_db.pop(id)
+    unindex_acudiente(deleted_acudiente)
+    invalidate_stats_cache()
+    
+    return {
+        "data": {"message": "Acudiente eliminado exitosamente", "id": id},
+        "error": None
+    }
 
 
 # ============================================================================
 # Endpoints de Sedes
 # ============================================================================
 
-@app.get("/api/sedes", response_model=ApiResponse)
-async def get_sedes():
+@app.get("/api/sedes")
+async def get_sedes(request: Request):
     """Obtiene la lista de todas las sedes"""
-    try:
-        sedes = list(sedes_db.values())
-        return ApiResponse(data=sedes, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener sedes: {str(e)}"}
-        )
+    etag, body = _list_snapshot("sedes", sedes_db)
+    return _cached_json_response(request, etag, body)
 
 
-@app.get("/api/sedes/{id}", response_model=ApiResponse)
+@app.get("/api/sedes/{id}")
 async def get_sede(id: int):
     """Obtiene una sede por ID"""
-    try:
-        if id not in sedes_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Sede no encontrada"
-            )
-        
-        sede = sedes_db[id]
-        return ApiResponse(data=sede, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener sede: {str(e)}"}
-        )
+    sede = sedes_db.get(id)
+    if sede is None:
+        raise SEDE_404.with_traceback(None)
+    
+    return {"data": sede, "error": None}
 
 
 @app.post("/api/sedes", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
 async def create_sede(sede: SedeCreate):
     """Crea una nueva sede"""
-    try:
-        # Validar que el nombre sea único
-        if not validate_nombre_sede_unico(sede.nombre):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Ya existe una sede con el nombre '{sede.nombre}'"
-            )
-        
-        # Generar nuevo ID
-        new_id = counters["sedes"] + 1
-        counters["sedes"] = new_id
-        
-        # Crear la sede
-        sede_dict = sede.model_dump()
-        sede_dict["id"] = new_id
-        
-        sedes_db[new_id] = sede_dict
-        
-        return ApiResponse(data=sede_dict, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al crear sede: {str(e)}"}
-        )
+    # Validar que el nombre sea único
+    if not validate_nombre_sede_unico(sede.nombre):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe una sede con el nombre '{sede.nombre}'"
+        )
+    
+    # Generar nuevo ID
+    new_id = next(_id_gen["sedes"])
+    
+    # Crear la sede
+    sede_dict = {**sede.__dict__, "id": new_id}
+    
+    sedes_db[new_id] = sede_dict
+    index_sede(sede_dict)
+    invalidate_list_snapshot("sedes")
+    
+    return {"data": sede_dict, "error": None}
 
 
 @app.put("/api/sedes/{id}", response_model=ApiResponse)
 async def update_sede(id: int, sede_update: SedeUpdate):
     """Actualiza una sede existente"""
-    try:
-        # Verificar que la sede exista
-        if id not in sedes_db:
+    # Verificar que la sede exista
+    if id not in sedes_db:
+        raise SEDE_404.with_traceback(None)
+    
+    sede_actual = sedes_db[id]
+    update_data = _set_fields(sede_update)
+    
+    # Validar nombre único si se está actualizando
+    if "nombre" in update_data:
+        if not validate_nombre_sede_unico(update_data["nombre"], exclude_id=id):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Sede no encontrada"
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Ya existe una sede con el nombre '{update_data['nombre']}'"
             )
-        
-        sede_actual = sedes_db[id]
-        update_data = sede_update.model_dump(exclude_unset=True)
-        
-        # Validar nombre único si se está actualizando
-        if "nombre" in update_data:
-            if not validate_nombre_sede_unico(update_data["nombre"], exclude_id=id):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Ya existe una sede con el nombre '{update_data['nombre']}'"
-                )
-        
-        # Actualizar campos
-        for key, value in update_data.items():
-            sede_actual[key] = value
-        
-        sedes_db[id] = sede_actual
-        
-        return ApiResponse(data=sede_actual, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al actualizar sede: {str(e)}"}
-        )
+    
+    # Actualizar campos en una copia nueva (reindexando por si cambia el nombre)
+    unindex_sede(sede_actual)
+    sede_actual = {**sede_actual, **update_data}
+    
+    sedes_db[id] = sede_actual
+    index_sede(sede_actual)
+    _rebuild_mensualidades_view_for(itertools.chain.from_iterable(
+        mensualidades_by_participante.get(id_participante, ())
+        for id_participante in participantes_by_sede.get(id, ())
+    ))
+    invalidate_list_snapshot("sedes")
+    
+    return {"data": sede_actual, "error": None}
 
 
 @app.delete("/api/sedes/{id}", response_model=ApiResponse)
 async def delete_sede(id: int):
     """Elimina una sede si no tiene participantes asociados"""
-    try:
-        # Verificar que la sede exista
-        if id not in sedes_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Sede no encontrada"
-            )
-        
-        # Verificar dependencias
-        dependencies = check_sede_has_participantes(id)
-        if dependencies["has_dependencies"]:
-            details = dependencies["details"]
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"No se puede eliminar la sede porque tiene {details['participantes']} participante(s) asociado(s)"
-            )
-        
-        # Eliminar sede
-        deleted_sede = sedes_db.pop(id)
-        
-        return ApiResponse(
-            data={"message": "Sede eliminada exitosamente", "id": id},
-            error=None
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al eliminar sede: {str(e)}"}
-        )
+    # Verificar que la sede exista
+    if id not in sedes_db:
+        raise SEDE_404.with_traceback(None)
+    
+    # Verificar dependencias
+    dependencies = check_sede_has_participantes(id)
+    if dependencies["has_dependencies"]:
+        details = dependencies["details"]
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No se puede eliminar la sede porque tiene {details['participantes']} participante(s) asociado(s)"
+        )
+    
+    # Eliminar sede
+    deleted_sede = sedes_db.pop(id)
+    unindex_sede(deleted_sede)
+    invalidate_list_snapshot("sedes")
+    
+    return {
+        "data": {"message": "Sede eliminada exitosamente", "id": id},
+        "error": None
+    }
 
 
 # ============================================================================
 # Endpoints de Mensualidades
 # ============================================================================
 
-@app.get("/api/mensualidades", response_model=ApiResponse)
-async def get_mensualidades():
+@app.get("/api/mensualidades")
+async def get_mensualidades(request: Request):
     """Obtiene la lista de todas las mensualidades con datos relacionados"""
-    try:
-        mensualidades = get_all_mensualidades_with_relations()
-        return ApiResponse(data=mensualidades, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener mensualidades: {str(e)}"}
-        )
+    etag, body = _list_snapshot("mensualidades", mensualidades_view)
+    return _cached_json_response(request, etag, body)
 
 
-@app.get("/api/mensualidades/{id}", response_model=ApiResponse)
+@app.get("/api/mensualidades/{id}")
 async def get_mensualidad(id: int):
     """Obtiene una mensualidad por ID con datos relacionados"""
-    try:
-        mensualidad = get_mensualidad_with_relations(id)
-        
-        if not mensualidad:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Mensualidad no encontrada"
-            )
-        
-        return ApiResponse(data=mensualidad, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener mensualidad: {str(e)}"}
-        )
+    mensualidad = mensualidades_view.get(id)
+    
+    if not mensualidad:
+        raise MENSUALIDAD_404.with_traceback(None)
+    
+    return {"data": mensualidad, "error": None}
 
 
-@app.get("/api/mensualidades/participante/{id_participante}", response_model=ApiResponse)
+@app.get("/api/mensualidades/participante/{id_participante}")
 async def get_mensualidades_by_participante(id_participante: int):
     """Obtiene todas las mensualidades de un participante específico"""
-    try:
-        # Verificar que el participante exista
-        if not validate_participante_exists(id_participante):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Participante con ID {id_participante} no encontrado"
-            )
-        
-        # Filtrar mensualidades por participante
-        mensualidades = []
-        for mensualidad in mensualidades_db.values():
-            if mensualidad["participant_id"] == id_participante:
-                mensualidad_with_relations = get_mensualidad_with_relations(mensualidad["id"])
-                if mensualidad_with_relations:
-                    mensualidades.append(mensualidad_with_relations)
-        
-        return ApiResponse(data=mensualidades, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener mensualidades del participante: {str(e)}"}
+    # Verificar que el participante exista
+    if id_participante not in participantes_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Participante con ID {id_participante} no encontrado"
         )
+    
+    # Mensualidades del participante (índice por participante, sin recorrer todas)
+    mensualidades = get_mensualidades_of_participante(id_participante)
+    
+    return {"data": mensualidades, "error": None}
 
 
 @app.post("/api/mensualidades", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
 async def create_mensualidad(mensualidad: MensualidadCreate):
     """Crea una nueva mensualidad"""
-    try:
-        # Validar que el participante exista
-        if not validate_participante_exists(mensualidad.participant_id):
+    # Validar que el participante exista
+    if mensualidad.participant_id not in participantes_db:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El participante con ID {mensualidad.participant_id} no existe"
+        )
+    
+    # Validar acudiente si se proporciona
+    if mensualidad.id_acudiente:
+        if mensualidad.id_acudiente not in acudientes_db:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"El participante con ID {mensualidad.participant_id} no existe"
+                detail=f"El acudiente con ID {mensualidad.id_acudiente} no existe"
             )
         
-        # Validar acudiente si se proporciona
-        if mensualidad.id_acudiente:
-            if not validate_acudiente_exists(mensualidad.id_acudiente):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El acudiente con ID {mensualidad.id_acudiente} no existe"
-                )
-            
-            # Validar que el acudiente pertenezca al participante
-            if not validate_acudiente_belongs_to_participante(
-                mensualidad.id_acudiente, 
-                mensualidad.participant_id
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El acudiente con ID {mensualidad.id_acudiente} no pertenece al participante con ID {mensualidad.participant_id}"
-                )
-        
-        # Validar que no exista otra mensualidad para el mismo participante, mes y año
-        if not validate_mensualidad_unica(
-            mensualidad.participant_id,
-            mensualidad.mes,
-            mensualidad.año
+        # Validar que el acudiente pertenezca al participante
+        if not validate_acudiente_belongs_to_participante(
+            mensualidad.id_acudiente, 
+            mensualidad.participant_id
         ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Ya existe una mensualidad para el participante {mensualidad.participant_id} en {mensualidad.mes}/{mensualidad.año}"
-            )
-        
-        # Validar fecha de pago si el estado es PAGADA
-        if mensualidad.estado == "PAGADA" and not mensualidad.fecha_pago:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La fecha de pago es requerida cuando el estado es PAGADA"
+                detail=f"El acudiente con ID {mensualidad.id_acudiente} no pertenece al participante con ID {mensualidad.participant_id}"
             )
-        
-        # Generar nuevo ID
-        new_id = counters["mensualidades"] + 1
-        counters["mensualidades"] = new_id
-        
-        # Crear la mensualidad
-        mensualidad_dict = mensualidad.model_dump()
-        mensualidad_dict["id"] = new_id
-        
-        mensualidades_db[new_id] = mensualidad_dict
-        
-        # Retornar con información completa
-        mensualidad_created = get_mensualidad_with_relations(new_id)
-        
-        return ApiResponse(data=mensualidad_created, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al crear mensualidad: {str(e)}"}
-        )
+    
+    # Validar que no exista otra mensualidad para el mismo participante, mes y año
+    if not validate_mensualidad_unica(
+        mensualidad.participant_id,
+        mensualidad.mes,
+        mensualidad.año
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe una mensualidad para el participante {mensualidad.participant_id} en {mensualidad.mes}/{mensualidad.año}"
+        )
+    
+    # Validar fecha de pago si el estado es PAGADA
+    if mensualidad.estado == "PAGADA" and not mensualidad.fecha_pago:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha de pago es requerida cuando el estado es PAGADA"
+        )
+    
+    # Generar nuevo ID
+    new_id = next(_id_gen["mensualidades"])
+    
+    # Crear la mensualidad
+    mensualidad_dict = {**mensualidad.__dict__, "id": new_id}
+    
+    mensualidades_db[new_id] = mensualidad_dict
+    index_mensualidad(mensualidad_dict)
+    invalidate_stats_cache()
+    _rebuild_mensualidad_view(new_id)
+    
+    # Retornar con información completa
+    mensualidad_created = mensualidades_view[new_id]
+    
+    return {"data": mensualidad_created, "error": None}
 
 
 @app.put("/api/mensualidades/{id}", response_model=ApiResponse)
 async def update_mensualidad(id: int, mensualidad_update: MensualidadUpdate):
     """Actualiza una mensualidad existente"""
-    try:
-        # Verificar que la mensualidad exista
-        if id not in mensualidades_db:
+    # Verificar que la mensualidad exista
+    if id not in mensualidades_db:
+        raise MENSUALIDAD_404.with_traceback(None)
+    
+    mensualidad_actual = mensualidades_db[id]
+    update_data = _set_fields(mensualidad_update)
+    
+    # Validar participante si se está actualizando
+    if "participant_id" in update_data:
+        if update_data["participant_id"] not in participantes_db:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Mensualidad no encontrada"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El participante con ID {update_data['participant_id']} no existe"
             )
-        
-        mensualidad_actual = mensualidades_db[id]
-        update_data = mensualidad_update.model_dump(exclude_unset=True)
-        
-        # Validar participante si se está actualizando
-        if "participant_id" in update_data:
-            if not validate_participante_exists(update_data["participant_id"]):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El participante con ID {update_data['participant_id']} no existe"
-                )
-        
-        # Validar acudiente si se está actualizando
-        if "id_acudiente" in update_data and update_data["id_acudiente"]:
-            if not validate_acudiente_exists(update_data["id_acudiente"]):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El acudiente con ID {update_data['id_acudiente']} no existe"
-                )
-            
-            # Obtener el participant_id (actual o actualizado)
-            participant_id = update_data.get("participant_id", mensualidad_actual["participant_id"])
-            
-            # Validar que el acudiente pertenezca al participante
-            if not validate_acudiente_belongs_to_participante(
-                update_data["id_acudiente"], 
-                participant_id
-            ):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El acudiente con ID {update_data['id_acudiente']} no pertenece al participante con ID {participant_id}"
-                )
-        
-        # Validar unicidad si se actualizan mes, año o participante
-        if any(key in update_data for key in ["participant_id", "mes", "año"]):
-            participant_id = update_data.get("participant_id", mensualidad_actual["participant_id"])
-            mes = update_data.get("mes", mensualidad_actual["mes"])
-            año = update_data.get("año", mensualidad_actual["año"])
-            
-            if not validate_mensualidad_unica(participant_id, mes, año, exclude_id=id):
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Ya existe una mensualidad para el participante {participant_id} en {mes}/{año}"
-                )
-        
-        # Validar fecha de pago si el estado es PAGADA
-        estado = update_data.get("estado", mensualidad_actual["estado"])
-        fecha_pago = update_data.get("fecha_pago", mensualidad_actual.get("fecha_pago"))
-        
-        if estado == "PAGADA" and not fecha_pago:
+    
+    # Validar acudiente si se está actualizando
+    if "id_acudiente" in update_data and update_data["id_acudiente"]:
+        if update_data["id_acudiente"] not in acudientes_db:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La fecha de pago es requerida cuando el estado es PAGADA"
+                detail=f"El acudiente con ID {update_data['id_acudiente']} no existe"
             )
         
-        # Actualizar campos
-        for key, value in update_data.items():
-            mensualidad_actual[key] = value
-        
-        mensualidades_db[id] = mensualidad_actual
+        # Obtener el participant_id (actual o actualizado)
+        participant_id = update_data.get("participant_id", mensualidad_actual["participant_id"])
         
-        # Retornar con información completa
-        mensualidad_updated = get_mensualidad_with_relations(id)
-        
-        return ApiResponse(data=mensualidad_updated, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al actualizar mensualidad: {str(e)}"}
-        )
+        # Validar que el acudiente pertenezca al participante
+        if not validate_acudiente_belongs_to_participante(
+            update_data["id_acudiente"], 
+            participant_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El acudiente con ID {update_data['id_acudiente']} no pertenece al participante con ID {participant_id}"
+            )
+    
+    # Validar unicidad si se actualizan mes, año o participante
+    if any(key in update_data for key in ["participant_id", "mes", "año"]):
+        participant_id = update_data.get("participant_id", mensualidad_actual["participant_id"])
+        mes = update_data.get("mes", mensualidad_actual["mes"])
+        año = update_data.get("año", mensualidad_actual["año"])
+        
+        if not validate_mensualidad_unica(participant_id, mes, año, exclude_id=id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Ya existe una mensualidad para el participante {participant_id} en {mes}/{año}"
+            )
+    
+    # Validar fecha de pago si el estado es PAGADA
+    estado = update_data.get("estado", mensualidad_actual["estado"])
+    fecha_pago = update_data.get("fecha_pago", mensualidad_actual.get("fecha_pago"))
+    
+    if estado == "PAGADA" and not fecha_pago:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha de pago es requerida cuando el estado es PAGADA"
+        )
+    
+    # Actualizar campos en una copia nueva (reindexando por si cambia el participante)
+    unindex_mensualidad(mensualidad_actual)
+    mensualidad_actual = {**mensualidad_actual, **update_data}
+    
+    mensualidades_db[id] = mensualidad_actual
+    index_mensualidad(mensualidad_actual)
+    _rebuild_mensualidad_view(id)
+    
+    # Retornar con información completa
+    mensualidad_updated = mensualidades_view[id]
+    
+    return {"data": mensualidad_updated, "error": None}
 
 
 @app.delete("/api/mensualidades/{id}", response_model=ApiResponse)
 async def delete_mensualidad(id: int):
     """Elimina una mensualidad"""
-    try:
-        # Verificar que la mensualidad exista
-        if id not in mensualidades_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Mensualidad no encontrada"
-            )
-        
-        # Eliminar mensualidad
-        deleted_mensualidad = mensualidades_db.pop(id)
-        
-        return ApiResponse(
-            data={"message": "Mensualidad eliminada exitosamente", "id": id},
-            error=None
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al eliminar mensualidad: {str(e)}"}
-        )
+    # Verificar que la mensualidad exista
+    if id not in mensualidades_db:
+        raise MENSUALIDAD_404.with_traceback(None)
+    
+    # Eliminar mensualidad
+    deleted_mensualidad = mensualidades_db.pop(id)
+    unindex_mensualidad(deleted_mensualidad)
+    invalidate_stats_cache()
+    _rebuild_mensualidad_view(id)
+    
+    return {
+        "data": {"message": "Mensualidad eliminada exitosamente", "id": id},
+        "error": None
+    }
 
 
 # ============================================================================
 # Endpoints de Usuarios
 # ============================================================================
 
-@app.get("/api/usuarios", response_model=ApiResponse)
-async def get_usuarios():
+@app.get("/api/usuarios")
+async def get_usuarios(request: Request):
     """Obtiene la lista de todos los usuarios"""
-    try:
-        usuarios = list(usuarios_db.values())
-        return ApiResponse(data=usuarios, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener usuarios: {str(e)}"}
-        )
+    etag, body = _list_snapshot("usuarios", usuarios_db)
+    return _cached_json_response(request, etag, body)
 
 
-@app.get("/api/usuarios/{id}", response_model=ApiResponse)
+@app.get("/api/usuarios/{id}")
 async def get_usuario(id: int):
     """Obtiene un usuario por ID"""
-    try:
-        if id not in usuarios_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
-            )
+    usuario = usuarios_db.get(id)
+    if usuario is None:
+        raise USUARIO_404.with_traceback(None)
 
-        usuario = usuarios_db[id]
-        return ApiResponse(data=usuario, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener usuario: {str(e)}"}
-        )
+    return {"data": usuario, "error": None}
 
 
 @app.post("/api/usuarios", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
 async def create_usuario(usuario: UsuarioCreate):
     """Crea un nuevo usuario"""
-    try:
-        # Verificar que el email no exista
-        for existing_usuario in usuarios_db.values():
-            if existing_usuario["email"] == usuario.email:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Ya existe un usuario con el email {usuario.email}"
-                )
-
-        # Generar nuevo ID
-        new_id = counters["usuarios"] + 1
-        counters["usuarios"] = new_id
-
-        # Crear el usuario
-        usuario_dict = usuario.model_dump()
-        usuario_dict["id_usuario"] = new_id
-
-        usuarios_db[new_id] = usuario_dict
-
-        return ApiResponse(data=usuario_dict, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al crear usuario: {str(e)}"}
+    # Verificar que el email no exista
+    if not validate_email_unico_usuario(usuario.email):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya existe un usuario con el email {usuario.email}"
         )
 
+    # Generar nuevo ID
+    new_id = next(_id_gen["usuarios"])
+
+    # Crear el usuario
+    usuario_dict = {**usuario.__dict__, "id_usuario": new_id}
+
+    usuarios_db[new_id] = usuario_dict
+    index_usuario(usuario_dict)
+    invalidate_list_snapshot("usuarios")
+
+    return {"data": usuario_dict, "error": None}
+
 
 @app.put("/api/usuarios/{id}", response_model=ApiResponse)
 async def update_usuario(id: int, usuario_update: UsuarioUpdate):
     """Actualiza un usuario existente"""
-    try:
-        # Verificar que el usuario exista
-        if id not in usuarios_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
-            )
-
-        usuario_actual = usuarios_db[id]
-        update_data = usuario_update.model_dump(exclude_unset=True)
-
-        # Verificar email único si se está actualizando
-        if "email" in update_data:
-            for existing_id, existing_usuario in usuarios_db.items():
-                if existing_id != id and existing_usuario["email"] == update_data["email"]:
-                    raise HTTPException(
-                        status_code=status.HTTP_409_CONFLICT,
-                        detail=f"Ya existe un usuario con el email {update_data['email']}"
-                    )
-
-        # Actualizar campos
-        for key, value in update_data.items():
-            usuario_actual[key] = value
-
-        usuarios_db[id] = usuario_actual
-
-        return ApiResponse(data=usuario_actual, error=None)
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al actualizar usuario: {str(e)}"}
-        )
+    # Verificar que el usuario exista
+    if id not in usuarios_db:
+        raise USUARIO_404.with_traceback(None)
 
+    usuario_actual = usuarios_db[id]
+    update_data = _set_fields(usuario_update)
 
-@app.delete("/api/usuarios/{id}", response_model=ApiResponse)
-async def delete_usuario(id: int):
-    """Elimina un usuario"""
-    try:
-        # Verificar que el usuario exista
-        if id not in usuarios_db:
+    # Verificar email único si se está actualizando
+    if "email" in update_data:
+        if not validate_email_unico_usuario(update_data["email"], exclude_id=id):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Ya existe un usuario con el email {update_data['email']}"
             )
 
-        # Eliminar usuario
-        deleted_usuario = usuarios_db.pop(id)
+    # Actualizar campos en una copia nueva (reindexando por si cambia el email)
+    unindex_usuario(usuario_actual)
+    usuario_actual = {**usuario_actual, **update_data}
 
-        return ApiResponse(
-            data={"message": "Usuario eliminado exitosamente", "id": id},
-            error=None
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al eliminar usuario: {str(e)}"}
-        )
+    usuarios_db[id] = usuario_actual
+    index_usuario(usuario_actual)
+    invalidate_list_snapshot("usuarios")
 
+    return {"data": usuario_actual, "error": None}
 
-# ============================================================================
-# Endpoints de Dashboard y Health
-# ============================================================================
-
-@app.get("/api/dashboard/stats", response_model=ApiResponse)
-async def get_dashboard_stats():
-    """Obtiene estadísticas generales del dashboard"""
-    try:
-        stats = {
-            "participantes": len(participantes_db),
-            "mensualidades": len(mensualidades_db),
-            "acudientes": len(acudientes_db)
-        }
-        
-        return ApiResponse(data=stats, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener estadísticas: {str(e)}"}
-        )
 
-
-@app.get("/api/health", response_model=ApiResponse)
-async def health_check():
-    """Verifica el estado de la API"""
-    try:
-        health_status = {
-            "status": "healthy",
-            "service": "Dashboard API - Corporación Todo por un Alma",
-            "version": "1.0.0"
-        }
-        
-        return ApiResponse(data=health_status, error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error en health check: {str(e)}"}
-        )
-
-
-# ============================================================================
-# Dashboard Stats
-# ============================================================================
-
-@app.get("/api/dashboard/stats", response_model=ApiResponse)
-async def get_dashboard_stats():
-    """Obtiene estadísticas generales del dashboard"""
-    try:
-        stats = DashboardStats(
-            participantes=len(participantes_db),
-            acudientes=len(acudientes_db),
-            mensualidades=len(mensualidades_db)
-        )
-        return ApiResponse(data=stats.model_dump(), error=None)
-    except Exception as e:
-        return ApiResponse(
-            data=None,
-            error={"message": f"Error al obtener estadísticas: {str(e)}"}
-        )
-
-
-# ============================================================================
-# Health Check
-# ============================================================================
-
-@app.get("/api/health")
-async def health_check():
-    """Endpoint de health check"""
-    return {"status": "ok", "message": "API is running"}
+@app.delete("/api/usuarios/{id}", response_model=ApiResponse)
+async def delete_usuario(id: int):
+    """Elimina un usuario"""
+    # Verificar que el usuario exista
+    if id not in usuarios_db:
+        raise USUARIO_404.with_traceback(None)
+
+    # Eliminar usuario
+    deleted_usuario = usuarios_db.pop(id)
+    unindex_usuario(deleted_usuario)
+    invalidate_list_snapshot("usuarios")
+
+    return {
+        "data": {"message": "Usuario eliminado exitosamente", "id": id},
+        "error": None
+    }
@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Migración 001: mensualidades
+--   * Restricción única uq_mensualidad_pid_mes_year (participant_id, mes, año)
+--   * monto como NUMERIC(12, 2) en lugar de FLOAT
+--
+-- create_all solo crea tablas nuevas: las bases de datos existentes (producción
+-- usa ENVIRONMENT=production y no ejecuta create_all) necesitan este script.
+-- Es idempotente y corre en una sola transacción (PostgreSQL):
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f migrations/001_mensualidades_unicidad_y_monto.sql
+--
+-- Si ya hay mensualidades repetidas, la restricción no se puede crear y la
+-- migración se revierte completa. Para encontrarlas:
+--
+--   SELECT participant_id, mes, "año", array_agg(id ORDER BY id) AS ids
+--   FROM mensualidades
+--   GROUP BY participant_id, mes, "año"
+--   HAVING count(*) > 1;
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE mensualidades
+    ALTER COLUMN monto TYPE NUMERIC(12, 2) USING round(monto::numeric, 2);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_mensualidad_pid_mes_year'
+    ) THEN
+        ALTER TABLE mensualidades
+            ADD CONSTRAINT uq_mensualidad_pid_mes_year UNIQUE (participant_id, mes, "año");
+    END IF;
+END
+$$;
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Migración 002: índices de las claves foráneas
+--   * ix_participantes_id_sede         participantes(id_sede)
+--   * ix_acudientes_id_participante    acudientes(id_participante)
+--   * ix_mensualidades_id_acudiente    mensualidades(id_acudiente)
+--
+-- PostgreSQL no indexa el lado que referencia de una clave foránea; los modelos
+-- declaran index=True en estas columnas, pero create_all solo crea los índices
+-- de tablas nuevas. Los nombres son los que genera SQLAlchemy, así que en una
+-- base creada con create_all el script no hace nada. mensualidades.participant_id
+-- no necesita índice propio: es la primera columna de uq_mensualidad_pid_mes_year
+-- (migración 001).
+--
+-- Es idempotente y corre en una sola transacción (PostgreSQL):
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f migrations/002_indices_claves_foraneas.sql
+-- ============================================================================
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_participantes_id_sede ON participantes (id_sede);
+CREATE INDEX IF NOT EXISTS ix_acudientes_id_participante ON acudientes (id_participante);
+CREATE INDEX IF NOT EXISTS ix_mensualidades_id_acudiente ON mensualidades (id_acudiente);
+
+COMMIT;
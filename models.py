@@ -1,6 +1,53 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Any, Dict
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints
+from typing import Annotated, Literal, Optional, Any, Dict
+from datetime import date
+import re
+
+# ============================================================================
+# Tipos con Restricciones Compartidas
+# ============================================================================
+
+# Campos con un conjunto cerrado de valores: Literal se valida con una búsqueda en
+# un conjunto (sin regex) y el valor guardado es siempre el mismo objeto str
+# compartido, en lugar de una copia nueva por registro
+TipoDocumento = Literal["CC", "TI", "CE", "PASAPORTE"]
+Genero = Literal["MASCULINO", "FEMENINO"]
+EstadoParticipante = Literal["ACTIVO", "INACTIVO"]
+EstadoSede = Literal["Activa", "Inactiva"]
+TipoSede = Literal["Principal", "Secundaria", "Temporal"]
+EstadoMensualidad = Literal["PAGADA", "PENDIENTE"]
+MetodoPago = Literal["TRANSFERENCIA", "EFECTIVO"]
+RolUsuario = Literal["ADMINISTRADOR", "CONSULTA"]
+
+
+def _validate_fecha_iso(v: str) -> str:
+    """Valida que la fecha tenga formato YYYY-MM-DD y sea una fecha válida"""
+    # La forma se comprueba aquí (sin regex aparte) porque fromisoformat también
+    # acepta variantes ISO compactas o de semana, p. ej. "20240101" o "2024-W01-1"
+    try:
+        if len(v) == 10 and v[4] == '-' and v[7] == '-':
+            date.fromisoformat(v)
+            return v
+    except ValueError:
+        pass
+    raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
+
+
+# Un único validador por campo de fecha (forma y validez de calendario en una pasada)
+FechaISO = Annotated[str, AfterValidator(_validate_fecha_iso)]
+
+# Debe haber un punto después de la última arroba (compilado una vez al importar)
+EMAIL_RE = re.compile(r".*@[^@]*\.[^@]*\Z", re.DOTALL)
+
+
+def _validate_email(v: str) -> str:
+    """Valida formato básico de email y lo normaliza a minúsculas"""
+    if EMAIL_RE.match(v) is None:
+        raise ValueError('Email inválido')
+    return v.lower()
+
+
+Email = Annotated[str, StringConstraints(min_length=1, max_length=100), AfterValidator(_validate_email)]
 
 # ============================================================================
 # Modelos de Entidades
@@ -10,132 +57,78 @@ class Participante(BaseModel):
     id: Optional[int] = None
     nombres: str = Field(..., min_length=1, max_length=100)
     apellidos: str = Field(..., min_length=1, max_length=100)
-    tipo_documento: str = Field(..., pattern="^(CC|TI|CE|PASAPORTE)$")
+    tipo_documento: TipoDocumento
     numero_documento: str = Field(..., min_length=1, max_length=50)
-    fecha_nacimiento: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
-    genero: str = Field(..., pattern="^(MASCULINO|FEMENINO)$")
-    fecha_ingreso: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
-    estado: str = Field(..., pattern="^(ACTIVO|INACTIVO)$")
+    fecha_nacimiento: FechaISO
+    genero: Genero
+    fecha_ingreso: FechaISO
+    estado: EstadoParticipante
     id_sede: int = Field(..., gt=0)
     telefono: Optional[str] = Field(None, max_length=20)
 
-    @field_validator('fecha_nacimiento', 'fecha_ingreso')
-    @classmethod
-    def validate_date_format(cls, v: str) -> str:
-        """Valida que la fecha tenga formato YYYY-MM-DD y sea válida"""
-        try:
-            datetime.strptime(v, '%Y-%m-%d')
-            return v
-        except ValueError:
-            raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
-
 
 class ParticipanteCreate(BaseModel):
     nombres: str = Field(..., min_length=1, max_length=100)
     apellidos: str = Field(..., min_length=1, max_length=100)
-    tipo_documento: str = Field(..., pattern="^(CC|TI|CE|PASAPORTE)$")
+    tipo_documento: TipoDocumento
     numero_documento: str = Field(..., min_length=1, max_length=50)
-    fecha_nacimiento: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
-    genero: str = Field(..., pattern="^(MASCULINO|FEMENINO)$")
-    fecha_ingreso: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
-    estado: str = Field(default="ACTIVO", pattern="^(ACTIVO|INACTIVO)$")
+    fecha_nacimiento: FechaISO
+    genero: Genero
+    fecha_ingreso: FechaISO
+    estado: EstadoParticipante = "ACTIVO"
     id_sede: int = Field(..., gt=0)
     telefono: Optional[str] = Field(None, max_length=20)
 
-    @field_validator('fecha_nacimiento', 'fecha_ingreso')
-    @classmethod
-    def validate_date_format(cls, v: str) -> str:
-        try:
-            datetime.strptime(v, '%Y-%m-%d')
-            return v
-        except ValueError:
-            raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
-
 
 class ParticipanteUpdate(BaseModel):
     nombres: Optional[str] = Field(None, min_length=1, max_length=100)
     apellidos: Optional[str] = Field(None, min_length=1, max_length=100)
-    tipo_documento: Optional[str] = Field(None, pattern="^(CC|TI|CE|PASAPORTE)$")
+    tipo_documento: Optional[TipoDocumento] = None
     numero_documento: Optional[str] = Field(None, min_length=1, max_length=50)
-    fecha_nacimiento: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
-    genero: Optional[str] = Field(None, pattern="^(MASCULINO|FEMENINO)$")
-    fecha_ingreso: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
-    estado: Optional[str] = Field(None, pattern="^(ACTIVO|INACTIVO)$")
+    fecha_nacimiento: Optional[FechaISO] = None
+    genero: Optional[Genero] = None
+    fecha_ingreso: Optional[FechaISO] = None
+    estado: Optional[EstadoParticipante] = None
     id_sede: Optional[int] = Field(None, gt=0)
     telefono: Optional[str] = Field(None, max_length=20)
 
-    @field_validator('fecha_nacimiento', 'fecha_ingreso')
-    @classmethod
-    def validate_date_format(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None:
-            try:
-                datetime.strptime(v, '%Y-%m-%d')
-                return v
-            except ValueError:
-                raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
-        return v
-
 
 class Acudiente(BaseModel):
     id_acudiente: Optional[int] = None
     nombres: str = Field(..., min_length=1, max_length=100)
     apellidos: str = Field(..., min_length=1, max_length=100)
-    tipo_documento: str = Field(..., pattern="^(CC|TI|CE|PASAPORTE)$")
+    tipo_documento: TipoDocumento
     numero_documento: str = Field(..., min_length=1, max_length=50)
     parentesco: str = Field(..., min_length=1, max_length=50)
     telefono: str = Field(..., min_length=1, max_length=20)
-    email: str = Field(..., min_length=1, max_length=100)
+    email: Email
     direccion: str = Field(..., min_length=1, max_length=200)
     id_participante: int = Field(..., gt=0)
 
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v: str) -> str:
-        """Valida formato básico de email"""
-        if '@' not in v or '.' not in v.split('@')[-1]:
-            raise ValueError('Email inválido')
-        return v.lower()
-
 
 class AcudienteCreate(BaseModel):
     nombres: str = Field(..., min_length=1, max_length=100)
     apellidos: str = Field(..., min_length=1, max_length=100)
-    tipo_documento: str = Field(..., pattern="^(CC|TI|CE|PASAPORTE)$")
+    tipo_documento: TipoDocumento
     numero_documento: str = Field(..., min_length=1, max_length=50)
     parentesco: str = Field(..., min_length=1, max_length=50)
     telefono: str = Field(..., min_length=1, max_length=20)
-    email: str = Field(..., min_length=1, max_length=100)
+    email: Email
     direccion: str = Field(..., min_length=1, max_length=200)
     id_participante: int = Field(..., gt=0)
 
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v: str) -> str:
-        if '@' not in v or '.' not in v.split('@')[-1]:
-            raise ValueError('Email inválido')
-        return v.lower()
-
 
 class AcudienteUpdate(BaseModel):
     nombres: Optional[str] = Field(None, min_length=1, max_length=100)
     apellidos: Optional[str] = Field(None, min_length=1, max_length=100)
-    tipo_documento: Optional[str] = Field(None, pattern="^(CC|TI|CE|PASAPORTE)$")
+    tipo_documento: Optional[TipoDocumento] = None
     numero_documento: Optional[str] = Field(None, min_length=1, max_length=50)
     parentesco: Optional[str] = Field(None, min_length=1, max_length=50)
     telefono: Optional[str] = Field(None, min_length=1, max_length=20)
-    email: Optional[str] = Field(None, min_length=1, max_length=100)
+    email: Optional[Email] = None
     direccion: Optional[str] = Field(None, min_length=1, max_length=200)
     id_participante: Optional[int] = Field(None, gt=0)
 
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None:
-            if '@' not in v or '.' not in v.split('@')[-1]:
-                raise ValueError('Email inválido')
-            return v.lower()
-        return v
-
 
 class Sede(BaseModel):
     id: Optional[int] = None
@@ -143,8 +136,8 @@ class Sede(BaseModel):
     direccion: str = Field(..., min_length=1, max_length=200)
     telefono: Optional[str] = Field(None, max_length=20)
     capacidad_maxima: Optional[int] = Field(None, gt=0)
-    estado: str = Field(default="Activa", pattern="^(Activa|Inactiva)$")
-    tipo: Optional[str] = Field(default="Principal", pattern="^(Principal|Secundaria|Temporal)$")
+    estado: EstadoSede = "Activa"
+    tipo: Optional[TipoSede] = "Principal"
 
 
 class SedeCreate(BaseModel):
@@ -152,8 +145,8 @@ class SedeCreate(BaseModel):
     direccion: str = Field(..., min_length=1, max_length=200)
     telefono: Optional[str] = Field(None, max_length=20)
     capacidad_maxima: Optional[int] = Field(None, gt=0)
-    estado: str = Field(default="Activa", pattern="^(Activa|Inactiva)$")
-    tipo: Optional[str] = Field(default="Principal", pattern="^(Principal|Secundaria|Temporal)$")
+    estado: EstadoSede = "Activa"
+    tipo: Optional[TipoSede] = "Principal"
 
 
 class SedeUpdate(BaseModel):
@@ -161,8 +154,8 @@ class SedeUpdate(BaseModel):
     direccion: Optional[str] = Field(None, min_length=1, max_length=200)
     telefono: Optional[str] = Field(None, max_length=20)
     capacidad_maxima: Optional[int] = Field(None, gt=0)
-    estado: Optional[str] = Field(None, pattern="^(Activa|Inactiva)$")
-    tipo: Optional[str] = Field(None, pattern="^(Principal|Secundaria|Temporal)$")
+    estado: Optional[EstadoSede] = None
+    tipo: Optional[TipoSede] = None
 
 
 class Mensualidad(BaseModel):
@@ -172,22 +165,11 @@ class Mensualidad(BaseModel):
     mes: int = Field(..., ge=1, le=12)
     año: int = Field(..., ge=2020, le=2030)
     monto: float = Field(..., gt=0)
-    estado: str = Field(..., pattern="^(PAGADA|PENDIENTE)$")
-    metodo_pago: str = Field(..., pattern="^(TRANSFERENCIA|EFECTIVO)$")
-    fecha_pago: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+    estado: EstadoMensualidad
+    metodo_pago: MetodoPago
+    fecha_pago: Optional[FechaISO] = None
     observaciones: Optional[str] = Field(None, max_length=500)
 
-    @field_validator('fecha_pago')
-    @classmethod
-    def validate_date_format(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None:
-            try:
-                datetime.strptime(v, '%Y-%m-%d')
-                return v
-            except ValueError:
-                raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
-        return v
-
 
 class MensualidadCreate(BaseModel):
     participant_id: int = Field(..., gt=0)
@@ -195,22 +177,11 @@ class MensualidadCreate(BaseModel):
     mes: int = Field(..., ge=1, le=12)
     año: int = Field(..., ge=2020, le=2030)
     monto: float = Field(..., gt=0)
-    estado: str = Field(default="PENDIENTE", pattern="^(PAGADA|PENDIENTE)$")
-    metodo_pago: str = Field(default="TRANSFERENCIA", pattern="^(TRANSFERENCIA|EFECTIVO)$")
-    fecha_pago: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+    estado: EstadoMensualidad = "PENDIENTE"
+    metodo_pago: MetodoPago = "TRANSFERENCIA"
+    fecha_pago: Optional[FechaISO] = None
     observaciones: Optional[str] = Field(None, max_length=500)
 
-    @field_validator('fecha_pago')
-    @classmethod
-    def validate_date_format(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None:
-            try:
-                datetime.strptime(v, '%Y-%m-%d')
-                return v
-            except ValueError:
-                raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
-        return v
-
 
 class MensualidadUpdate(BaseModel):
     participant_id: Optional[int] = Field(None, gt=0)
@@ -218,22 +189,11 @@ class MensualidadUpdate(BaseModel):
     mes: Optional[int] = Field(None, ge=1, le=12)
     año: Optional[int] = Field(None, ge=2020, le=2030)
     monto: Optional[float] = Field(None, gt=0)
-    estado: Optional[str] = Field(None, pattern="^(PAGADA|PENDIENTE)$")
-    metodo_pago: Optional[str] = Field(None, pattern="^(TRANSFERENCIA|EFECTIVO)$")
-    fecha_pago: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+    estado: Optional[EstadoMensualidad] = None
+    metodo_pago: Optional[MetodoPago] = None
+    fecha_pago: Optional[FechaISO] = None
     observaciones: Optional[str] = Field(None, max_length=500)
 
-    @field_validator('fecha_pago')
-    @classmethod
-    def validate_date_format(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None:
-            try:
-                datetime.strptime(v, '%Y-%m-%d')
-                return v
-            except ValueError:
-                raise ValueError(f'Fecha inválida: {v}. Debe tener formato YYYY-MM-DD')
-        return v
-
 
 # ============================================================================
 # Modelos de Respuesta
@@ -246,44 +206,20 @@ class ApiResponse(BaseModel):
 
 class Usuario(BaseModel):
     id_usuario: Optional[int] = None
-    email: str = Field(..., min_length=1, max_length=100)
-    rol: str = Field(..., pattern="^(ADMINISTRADOR|CONSULTA)$")
-
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v: str) -> str:
-        """Valida formato básico de email"""
-        if '@' not in v or '.' not in v.split('@')[-1]:
-            raise ValueError('Email inválido')
-        return v.lower()
+    email: Email
+    rol: RolUsuario
 
 
 class UsuarioCreate(BaseModel):
-    email: str = Field(..., min_length=1, max_length=100)
+    email: Email
     password: str = Field(..., min_length=8, max_length=100)
-    rol: str = Field(default="CONSULTA", pattern="^(ADMINISTRADOR|CONSULTA)$")
-
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v: str) -> str:
-        if '@' not in v or '.' not in v.split('@')[-1]:
-            raise ValueError('Email inválido')
-        return v.lower()
+    rol: RolUsuario = "CONSULTA"
 
 
 class UsuarioUpdate(BaseModel):
-    email: Optional[str] = Field(None, min_length=1, max_length=100)
+    email: Optional[Email] = None
     password: Optional[str] = Field(None, min_length=8, max_length=100)
-    rol: Optional[str] = Field(None, pattern="^(ADMINISTRADOR|CONSULTA)$")
-
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v: Optional[str]) -> Optional[str]:
-        if v is not None:
-            if '@' not in v or '.' not in v.split('@')[-1]:
-                raise ValueError('Email inválido')
-            return v.lower()
-        return v
+    rol: Optional[RolUsuario] = None
 
 
 class DashboardStats(BaseModel):
@@ -3,8 +3,8 @@ Servicios y validaciones de lógica de negocio.
 Contiene funciones para validar datos y verificar integridad referencial.
 """
 
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, Set, Tuple
+from datetime import date
 import re
 from database import (
     participantes_db, 
@@ -17,6 +17,10 @@ from database import (
 # Validaciones de Formato
 # ============================================================================
 
+# Patrón básico de email, compilado una sola vez al importar el módulo
+_EMAIL_FORMAT_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
 def validate_email_format(email: str) -> bool:
     """
     Valida que el email tenga un formato válido.
@@ -30,9 +34,7 @@ def validate_email_format(email: str) -> bool:
     if not email or '@' not in email:
         return False
     
-    # Patrón básico de email
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _EMAIL_FORMAT_RE.match(email) is not None
 
 
 def validate_fecha_format(fecha: str) -> bool:
@@ -45,13 +47,172 @@ def validate_fecha_format(fecha: str) -> bool:
     Returns:
         True si el formato es válido, False en caso contrario
     """
+    # fromisoformat también acepta variantes ISO compactas o de semana
+    # (p. ej. "20240101", "2024-W01-1"), así que se exige la forma YYYY-MM-DD
     try:
-        datetime.strptime(fecha, '%Y-%m-%d')
+        if len(fecha) != 10 or fecha[4] != '-' or fecha[7] != '-':
+            return False
+        date.fromisoformat(fecha)
         return True
     except (ValueError, TypeError):
         return False
 
 
+# ============================================================================
+# Índices Secundarios en Memoria
+# ============================================================================
+
+# IDs de los registros dependientes agrupados por registro padre. Se mantienen en
+# cada create/update/delete para no recorrer todos los registros en cada consulta;
+# su tamaño es el conteo que usan las verificaciones antes de eliminar.
+acudientes_by_participante: Dict[int, Set[int]] = {}
+mensualidades_by_participante: Dict[int, Set[int]] = {}
+participantes_by_sede: Dict[int, Set[int]] = {}
+mensualidades_by_acudiente: Dict[int, Set[int]] = {}
+
+# Valores únicos -> ID del registro que los usa, para validar unicidad en O(1)
+documento_to_participante_id: Dict[str, int] = {}
+documento_to_acudiente_id: Dict[str, int] = {}
+nombre_sede_to_id: Dict[str, int] = {}
+email_to_usuario_id: Dict[str, int] = {}
+# (participant_id, mes, año) -> ID de la mensualidad
+mensualidad_key_index: Dict[Tuple[int, int, int], int] = {}
+
+# Nombre completo ("nombres apellidos") calculado al escribir, para no armarlo en cada lectura
+nombre_completo_participante: Dict[int, str] = {}
+nombre_completo_acudiente: Dict[int, str] = {}
+
+
+def _index_add(index: Dict[int, Set[int]], key: Any, row_id: int) -> None:
+    """Agrega un ID al grupo de la clave indicada"""
+    index.setdefault(key, set()).add(row_id)
+
+
+def _index_discard(index: Dict[int, Set[int]], key: Any, row_id: int) -> None:
+    """Quita un ID del grupo de la clave indicada (y el grupo si queda vacío)"""
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(row_id)
+        if not ids:
+            del index[key]
+
+
+def _unique_discard(index: Dict[Any, int], key: Any, row_id: int) -> None:
+    """Libera un valor único solo si pertenece al registro indicado"""
+    if index.get(key) == row_id:
+        del index[key]
+
+
+def _normalize_nombre_sede(nombre: str) -> str:
+    """Normaliza el nombre de una sede para compararlo sin mayúsculas ni espacios extremos"""
+    return nombre.lower().strip()
+
+
+def _normalize_email(email: str) -> str:
+    """Normaliza un email para compararlo sin distinguir mayúsculas"""
+    return email.lower()
+
+
+def _nombre_completo(row: Dict[str, Any]) -> str:
+    """Nombre completo de un participante o acudiente"""
+    return f"{row['nombres']} {row['apellidos']}"
+
+
+def index_participante(participante: Dict[str, Any]) -> None:
+    """Registra un participante en los índices (llamar tras crearlo o actualizarlo)"""
+    documento_to_participante_id[participante["numero_documento"]] = participante["id"]
+    nombre_completo_participante[participante["id"]] = _nombre_completo(participante)
+    _index_add(participantes_by_sede, participante["id_sede"], participante["id"])
+
+
+def unindex_participante(participante: Dict[str, Any]) -> None:
+    """Quita un participante de los índices (llamar antes de actualizarlo o al eliminarlo)"""
+    _unique_discard(documento_to_participante_id, participante["numero_documento"], participante["id"])
+    nombre_completo_participante.pop(participante["id"], None)
+    _index_discard(participantes_by_sede, participante["id_sede"], participante["id"])
+
+
+def index_acudiente(acudiente: Dict[str, Any]) -> None:
+    """Registra un acudiente en los índices (llamar tras crearlo o actualizarlo)"""
+    _index_add(acudientes_by_participante, acudiente["id_participante"], acudiente["id_acudiente"])
+    documento_to_acudiente_id[acudiente["numero_documento"]] = acudiente["id_acudiente"]
+    nombre_completo_acudiente[acudiente["id_acudiente"]] = _nombre_completo(acudiente)
+
+
+def unindex_acudiente(acudiente: Dict[str, Any]) -> None:
+    """Quita un acudiente de los índices (llamar antes de actualizarlo o al eliminarlo)"""
+    _index_discard(acudientes_by_participante, acudiente["id_participante"], acudiente["id_acudiente"])
+    _unique_discard(documento_to_acudiente_id, acudiente["numero_documento"], acudiente["id_acudiente"])
+    nombre_completo_acudiente.pop(acudiente["id_acudiente"], None)
+
+
+def _mensualidad_key(mensualidad: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Clave única de una mensualidad: (participante, mes, año)"""
+    return (mensualidad["participant_id"], mensualidad["mes"], mensualidad["año"])
+
+
+def index_mensualidad(mensualidad: Dict[str, Any]) -> None:
+    """Registra una mensualidad en los índices (llamar tras crearla o actualizarla)"""
+    _index_add(mensualidades_by_participante, mensualidad["participant_id"], mensualidad["id"])
+    mensualidad_key_index[_mensualidad_key(mensualidad)] = mensualidad["id"]
+    if mensualidad.get("id_acudiente"):
+        _index_add(mensualidades_by_acudiente, mensualidad["id_acudiente"], mensualidad["id"])
+
+
+def unindex_mensualidad(mensualidad: Dict[str, Any]) -> None:
+    """Quita una mensualidad de los índices (llamar antes de actualizarla o al eliminarla)"""
+    _index_discard(mensualidades_by_participante, mensualidad["participant_id"], mensualidad["id"])
+    _unique_discard(mensualidad_key_index, _mensualidad_key(mensualidad), mensualidad["id"])
+    if mensualidad.get("id_acudiente"):
+        _index_discard(mensualidades_by_acudiente, mensualidad["id_acudiente"], mensualidad["id"])
+
+
+def index_sede(sede: Dict[str, Any]) -> None:
+    """Registra una sede en los índices (llamar tras crearla o actualizarla)"""
+    nombre_sede_to_id[_normalize_nombre_sede(sede["nombre"])] = sede["id"]
+
+
+def unindex_sede(sede: Dict[str, Any]) -> None:
+    """Quita una sede de los índices (llamar antes de actualizarla o al eliminarla)"""
+    _unique_discard(nombre_sede_to_id, _normalize_nombre_sede(sede["nombre"]), sede["id"])
+
+
+def index_usuario(usuario: Dict[str, Any]) -> None:
+    """Registra un usuario en los índices (llamar tras crearlo o actualizarlo)"""
+    email_to_usuario_id[_normalize_email(usuario["email"])] = usuario["id_usuario"]
+
+
+def unindex_usuario(usuario: Dict[str, Any]) -> None:
+    """Quita un usuario de los índices (llamar antes de actualizarlo o al eliminarlo)"""
+    _unique_discard(email_to_usuario_id, _normalize_email(usuario["email"]), usuario["id_usuario"])
+
+
+def rebuild_indexes() -> None:
+    """
+    Reconstruye todos los índices a partir del contenido actual de los diccionarios.
+    Los usuarios no se almacenan en database; quien los almacena los registra con index_usuario.
+    """
+    for index in (
+        acudientes_by_participante, mensualidades_by_participante,
+        participantes_by_sede, mensualidades_by_acudiente,
+        documento_to_participante_id, documento_to_acudiente_id,
+        nombre_sede_to_id, email_to_usuario_id, mensualidad_key_index,
+        nombre_completo_participante, nombre_completo_acudiente
+    ):
+        index.clear()
+    for participante in participantes_db.values():
+        index_participante(participante)
+    for sede in sedes_db.values():
+        index_sede(sede)
+    for acudiente in acudientes_db.values():
+        index_acudiente(acudiente)
+    for mensualidad in mensualidades_db.values():
+        index_mensualidad(mensualidad)
+
+
+rebuild_indexes()
+
+
 # ============================================================================
 # Validaciones de Existencia
 # ============================================================================
@@ -113,11 +274,8 @@ def validate_documento_unico_participante(
     Returns:
         True si el documento es único, False si ya existe
     """
-    for id_part, participante in participantes_db.items():
-        if participante["numero_documento"] == numero_documento:
-            if exclude_id is None or id_part != exclude_id:
-                return False
-    return True
+    owner = documento_to_participante_id.get(numero_documento)
+    return owner is None or owner == exclude_id
 
 
 def validate_documento_unico_acudiente(
@@ -134,11 +292,8 @@ def validate_documento_unico_acudiente(
     Returns:
         True si el documento es único, False si ya existe
     """
-    for id_acud, acudiente in acudientes_db.items():
-        if acudiente["numero_documento"] == numero_documento:
-            if exclude_id is None or id_acud != exclude_id:
-                return False
-    return True
+    owner = documento_to_acudiente_id.get(numero_documento)
+    return owner is None or owner == exclude_id
 
 
 def validate_nombre_sede_unico(
@@ -155,12 +310,26 @@ def validate_nombre_sede_unico(
     Returns:
         True si el nombre es único, False si ya existe
     """
-    nombre_lower = nombre.lower().strip()
-    for id_sede, sede in sedes_db.items():
-        if sede["nombre"].lower().strip() == nombre_lower:
-            if exclude_id is None or id_sede != exclude_id:
-                return False
-    return True
+    owner = nombre_sede_to_id.get(_normalize_nombre_sede(nombre))
+    return owner is None or owner == exclude_id
+
+
+def validate_email_unico_usuario(
+    email: str, 
+    exclude_id: Optional[int] = None
+) -> bool:
+    """
+    Valida que el email de un usuario sea único.
+    
+    Args:
+        email: Email a validar
+        exclude_id: ID del usuario a excluir de la validación (para updates)
+        
+    Returns:
+        True si el email es único, False si ya existe
+    """
+    owner = email_to_usuario_id.get(_normalize_email(email))
+    return owner is None or owner == exclude_id
 
 
 def validate_mensualidad_unica(
@@ -181,13 +350,8 @@ def validate_mensualidad_unica(
     Returns:
         True si es única, False si ya existe
     """
-    for id_mens, mensualidad in mensualidades_db.items():
-        if (mensualidad["participant_id"] == participant_id and
-            mensualidad["mes"] == mes and
-            mensualidad["año"] == año):
-            if exclude_id is None or id_mens != exclude_id:
-                return False
-    return True
+    owner = mensualidad_key_index.get((participant_id, mes, año))
+    return owner is None or owner == exclude_id
 
 
 # ============================================================================
@@ -229,15 +393,8 @@ def check_participante_has_dependencies(id_participante: int) -> Dict[str, Any]:
     Returns:
         Dict con has_dependencies (bool) y details (dict con conteos)
     """
-    acudientes_count = sum(
-        1 for acudiente in acudientes_db.values()
-        if acudiente["id_participante"] == id_participante
-    )
-    
-    mensualidades_count = sum(
-        1 for mensualidad in mensualidades_db.values()
-        if mensualidad["participant_id"] == id_participante
-    )
+    acudientes_count = len(acudientes_by_participante.get(id_participante, ()))
+    mensualidades_count = len(mensualidades_by_participante.get(id_participante, ()))
     
     has_dependencies = acudientes_count > 0 or mensualidades_count > 0
     
@@ -260,10 +417,7 @@ def check_sede_has_participantes(id_sede: int) -> Dict[str, Any]:
     Returns:
         Dict con has_dependencies (bool) y details (dict con conteo)
     """
-    participantes_count = sum(
-        1 for participante in participantes_db.values()
-        if participante["id_sede"] == id_sede
-    )
+    participantes_count = len(participantes_by_sede.get(id_sede, ()))
     
     has_dependencies = participantes_count > 0
     
@@ -285,10 +439,7 @@ def check_acudiente_has_mensualidades(id_acudiente: int) -> Dict[str, Any]:
     Returns:
         Dict con has_dependencies (bool) y details (dict con conteo)
     """
-    mensualidades_count = sum(
-        1 for mensualidad in mensualidades_db.values()
-        if mensualidad.get("id_acudiente") == id_acudiente
-    )
+    mensualidades_count = len(mensualidades_by_acudiente.get(id_acudiente, ()))
     
     has_dependencies = mensualidades_count > 0
     
@@ -314,18 +465,30 @@ def get_participante_with_sede(id_participante: int) -> Optional[Dict[str, Any]]
     Returns:
         Dict con datos del participante y sede, o None si no existe
     """
-    if id_participante not in participantes_db:
+    participante = participantes_db.get(id_participante)
+    if participante is None:
         return None
     
-    participante = participantes_db[id_participante].copy()
-    id_sede = participante["id_sede"]
-    
-    if id_sede in sedes_db:
-        participante["sede"] = sedes_db[id_sede].copy()
-    else:
-        participante["sede"] = None
+    # Los registros guardados no se modifican en sitio (las actualizaciones los
+    # reemplazan por una copia nueva), así que la sede se referencia sin copiarla
+    return {**participante, "sede": sedes_db.get(participante["id_sede"])}
+
+
+def _merge_acudiente(
+    acudiente: Dict[str, Any],
+    participante: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Combina un acudiente con su participante (ya resuelto) sin volver a consultarlo.
     
-    return participante
+    Args:
+        acudiente: Datos del acudiente
+        participante: Datos del participante, o None si no existe
+        
+    Returns:
+        Copia del acudiente con la clave "participante"
+    """
+    return {**acudiente, "participante": participante}
 
 
 def get_acudiente_with_participante(id_acudiente: int) -> Optional[Dict[str, Any]]:
@@ -338,18 +501,140 @@ def get_acudiente_with_participante(id_acudiente: int) -> Optional[Dict[str, Any
     Returns:
         Dict con datos del acudiente y participante, o None si no existe
     """
-    if id_acudiente not in acudientes_db:
+    acudiente = acudientes_db.get(id_acudiente)
+    if acudiente is None:
         return None
     
-    acudiente = acudientes_db[id_acudiente].copy()
-    id_participante = acudiente["id_participante"]
+    return _merge_acudiente(acudiente, participantes_db.get(acudiente["id_participante"]))
+
+
+def get_acudientes_of_participante(id_participante: int) -> list:
+    """
+    Obtiene los acudientes de un participante usando el índice por participante.
+    
+    Args:
+        id_participante: ID del participante
+        
+    Returns:
+        Lista de acudientes del participante, ordenada por ID
+    """
+    ids = acudientes_by_participante.get(id_participante, ())
+    return [acudientes_db[id_acudiente] for id_acudiente in sorted(ids)]
+
+
+def get_all_acudientes_with_participante() -> list:
+    """
+    Obtiene todos los acudientes con información de su participante en una sola pasada.
+    
+    Returns:
+        Lista de acudientes con datos del participante
+    """
+    participantes = participantes_db
+    return [
+        _merge_acudiente(acudiente, participantes.get(acudiente["id_participante"]))
+        for acudiente in acudientes_db.values()
+    ]
+
+
+# Campos agregados cuando la mensualidad no tiene participante o acudiente
+_PARTICIPANTE_NO_DISPONIBLE = {
+    "participant_name": "N/A",
+    "participant_documento": "N/A",
+    "sede_id": None,
+    "sede_name": "N/A"
+}
+_SIN_ACUDIENTE = {"acudiente_name": None, "acudiente_documento": None}
+
+
+def _participante_fields(
+    participante: Optional[Dict[str, Any]],
+    sede: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Campos de participante y sede que se agregan a cada mensualidad"""
+    if participante is None:
+        return _PARTICIPANTE_NO_DISPONIBLE
+    
+    fields = {
+        "participant_name": (
+            nombre_completo_participante.get(participante["id"])
+            or _nombre_completo(participante)
+        ),
+        "participant_documento": participante["numero_documento"]
+    }
+    if sede is not None:
+        fields["sede_id"] = participante["id_sede"]
+        fields["sede_name"] = sede["nombre"]
+    return fields
+
+
+def _acudiente_fields(acudiente: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Campos de acudiente que se agregan a cada mensualidad"""
+    if acudiente is None:
+        return _SIN_ACUDIENTE
+    
+    return {
+        "acudiente_name": (
+            nombre_completo_acudiente.get(acudiente["id_acudiente"])
+            or _nombre_completo(acudiente)
+        ),
+        "acudiente_documento": acudiente["numero_documento"]
+    }
+
+
+def _merge_mensualidad(
+    mensualidad: Dict[str, Any],
+    participante: Optional[Dict[str, Any]],
+    sede: Optional[Dict[str, Any]],
+    acudiente: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Combina una mensualidad con su participante, sede y acudiente (ya resueltos).
     
-    if id_participante in participantes_db:
-        acudiente["participante"] = participantes_db[id_participante].copy()
-    else:
-        acudiente["participante"] = None
+    Args:
+        mensualidad: Datos de la mensualidad
+        participante: Datos del participante, o None si no existe
+        sede: Datos de la sede del participante, o None si no existe
+        acudiente: Datos del acudiente, o None si no tiene
+        
+    Returns:
+        Nuevo dict con la mensualidad y los datos relacionados
+    """
+    return {
+        **mensualidad,
+        **_participante_fields(participante, sede),
+        **_acudiente_fields(acudiente),
+        # Renombrar campos para compatibilidad con frontend
+        "valor": mensualidad["monto"],
+        "status": mensualidad["estado"]
+    }
+
+
+def _resolve_mensualidad(
+    mensualidad: Dict[str, Any],
+    participantes: Dict[int, Dict[str, Any]],
+    sedes: Dict[int, Dict[str, Any]],
+    acudientes: Dict[int, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Resuelve las relaciones de una mensualidad con búsquedas directas en los diccionarios"""
+    participante = participantes.get(mensualidad["participant_id"])
+    sede = sedes.get(participante["id_sede"]) if participante is not None else None
+    id_acudiente = mensualidad.get("id_acudiente")
+    acudiente = acudientes.get(id_acudiente) if id_acudiente else None
+    return _merge_mensualidad(mensualidad, participante, sede, acudiente)
+
+
+def _attach_relations(mensualidad: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Agrega los datos relacionados a una mensualidad que ya se tiene en mano,
+    sin volver a buscarla en mensualidades_db.
     
-    return acudiente
+    Args:
+        mensualidad: Datos de la mensualidad
+        
+    Returns:
+        Copia de la mensualidad con los datos relacionados
+    """
+    return _resolve_mensualidad(mensualidad, participantes_db, sedes_db, acudientes_db)
 
 
 def get_mensualidad_with_relations(id_mensualidad: int) -> Optional[Dict[str, Any]]:
@@ -362,56 +647,59 @@ def get_mensualidad_with_relations(id_mensualidad: int) -> Optional[Dict[str, An
     Returns:
         Dict con datos completos de la mensualidad, o None si no existe
     """
-    if id_mensualidad not in mensualidades_db:
-        return None
-    
-    mensualidad = mensualidades_db[id_mensualidad].copy()
-    
-    # Agregar información del participante
-    participant_id = mensualidad["participant_id"]
-    if participant_id in participantes_db:
-        participante = participantes_db[participant_id]
-        mensualidad["participant_name"] = f"{participante['nombres']} {participante['apellidos']}"
-        mensualidad["participant_documento"] = participante["numero_documento"]
-
-        # Agregar información de la sede
-        id_sede = participante["id_sede"]
-        if id_sede in sedes_db:
-            mensualidad["sede_id"] = id_sede
-            mensualidad["sede_name"] = sedes_db[id_sede]["nombre"]
-    else:
-        mensualidad["participant_name"] = "N/A"
-        mensualidad["participant_documento"] = "N/A"
-        mensualidad["sede_id"] = None
-        mensualidad["sede_name"] = "N/A"
-
-    # Agregar información del acudiente si existe
-    id_acudiente = mensualidad.get("id_acudiente")
-    if id_acudiente and id_acudiente in acudientes_db:
-        acudiente = acudientes_db[id_acudiente]
-        mensualidad["acudiente_name"] = f"{acudiente['nombres']} {acudiente['apellidos']}"
-        mensualidad["acudiente_documento"] = acudiente["numero_documento"]
-    else:
-        mensualidad["acudiente_name"] = None
-        mensualidad["acudiente_documento"] = None
-    
-    # Renombrar campos para compatibilidad con frontend
-    mensualidad["valor"] = mensualidad["monto"]
-    mensualidad["status"] = mensualidad["estado"]
+    mensualidad = mensualidades_db.get(id_mensualidad)
+    return _attach_relations(mensualidad) if mensualidad is not None else None
+
+
+def get_mensualidades_of_participante(id_participante: int) -> list:
+    """
+    Obtiene las mensualidades de un participante (con datos relacionados) usando el índice.
     
-    return mensualidad
+    Args:
+        id_participante: ID del participante
+        
+    Returns:
+        Lista de mensualidades del participante, ordenada por ID
+    """
+    ids = mensualidades_by_participante.get(id_participante, ())
+    return [_attach_relations(mensualidades_db[id_mensualidad]) for id_mensualidad in sorted(ids)]
 
 
 def get_all_mensualidades_with_relations() -> list:
     """
-    Obtiene todas las mensualidades con información completa.
+    Obtiene todas las mensualidades con información completa en una sola pasada.
+    
+    Los campos derivados de cada participante y acudiente (nombres formateados,
+    sede) se calculan una vez por registro relacionado y se reutilizan en todas
+    sus mensualidades.
     
     Returns:
         Lista de mensualidades con datos relacionados
     """
-    mensualidades = []
-    for id_mensualidad in mensualidades_db.keys():
-        mensualidad = get_mensualidad_with_relations(id_mensualidad)
-        if mensualidad:
-            mensualidades.append(mensualidad)
-    return mensualidades
+    participantes, sedes, acudientes = participantes_db, sedes_db, acudientes_db
+    participante_fields: Dict[int, Dict[str, Any]] = {}
+    acudiente_fields: Dict[Any, Dict[str, Any]] = {}
+    
+    result = []
+    for mensualidad in mensualidades_db.values():
+        id_participante = mensualidad["participant_id"]
+        p_fields = participante_fields.get(id_participante)
+        if p_fields is None:
+            participante = participantes.get(id_participante)
+            sede = sedes.get(participante["id_sede"]) if participante is not None else None
+            p_fields = participante_fields[id_participante] = _participante_fields(participante, sede)
+        
+        id_acudiente = mensualidad.get("id_acudiente")
+        a_fields = acudiente_fields.get(id_acudiente)
+        if a_fields is None:
+            acudiente = acudientes.get(id_acudiente) if id_acudiente else None
+            a_fields = acudiente_fields[id_acudiente] = _acudiente_fields(acudiente)
+        
+        result.append({
+            **mensualidad,
+            **p_fields,
+            **a_fields,
+            "valor": mensualidad["monto"],
+            "status": mensualidad["estado"]
+        })
+    return result
@@ -1,14 +1,60 @@
 """
 Script de pruebas de integración para verificar todos los endpoints de la API.
 Este script prueba validaciones, restricciones de integridad y formato de respuestas.
+
+Uso: python test_integration.py [--mode full|smoke]
+El modo smoke (también con SMOKE=1) omite las pruebas de integridad al eliminar.
 """
 
+import argparse
+import os
+import sys
+import threading
 import requests
 import json
-from typing import Dict, Any
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 BASE_URL = "http://localhost:8081"
 
+# URLs completas calculadas una vez al cargar el módulo
+URL_HEALTH = f"{BASE_URL}/api/health"
+URL_SEDES = f"{BASE_URL}/api/sedes"
+URL_SEDE_1 = f"{URL_SEDES}/1"
+URL_PARTICIPANTES = f"{BASE_URL}/api/participantes"
+URL_PARTICIPANTE_1 = f"{URL_PARTICIPANTES}/1"
+URL_PARTICIPANTE_INEXISTENTE = f"{URL_PARTICIPANTES}/999"
+URL_ACUDIENTES = f"{BASE_URL}/api/acudientes"
+URL_ACUDIENTE_1 = f"{URL_ACUDIENTES}/1"
+URL_ACUDIENTES_PARTICIPANTE_1 = f"{URL_ACUDIENTES}/participante/1"
+URL_MENSUALIDADES = f"{BASE_URL}/api/mensualidades"
+URL_MENSUALIDADES_PARTICIPANTE_1 = f"{URL_MENSUALIDADES}/participante/1"
+URL_DASHBOARD = f"{BASE_URL}/api/dashboard"
+URL_DASHBOARD_STATS = f"{URL_DASHBOARD}/stats"
+
+# Máximo de peticiones simultáneas al precargar lecturas
+MAX_CONCURRENT_REQUESTS = 8
+
+# GETs cuyo resultado no depende de las escrituras de la suite: se lanzan todos a la vez
+# al inicio y cada prueba consume su respuesta ya descargada. Las estadísticas del
+# dashboard quedan fuera porque deben reflejar los registros creados por las pruebas.
+READ_ONLY_URLS = [
+    URL_HEALTH,
+    URL_SEDES,
+    URL_PARTICIPANTES,
+    URL_ACUDIENTES,
+    URL_ACUDIENTES_PARTICIPANTE_1,
+    URL_MENSUALIDADES,
+    URL_MENSUALIDADES_PARTICIPANTE_1,
+]
+
+# Claves esperadas en las respuestas, definidas una vez y comparadas como subconjunto
+ENVELOPE_KEYS = frozenset({"data", "error"})
+MENSUALIDAD_RELATED_KEYS = frozenset({"participant_name", "sede_name"})
+
 # Colores para output
 class Colors:
     GREEN = '\033[92m'
@@ -17,46 +63,148 @@ class Colors:
     BLUE = '\033[94m'
     END = '\033[0m'
 
+# Sin colores cuando la salida no es una terminal (p. ej. logs de CI) o con NO_COLOR
+USE_COLOR = sys.stdout.isatty() and not os.environ.get("NO_COLOR")
+if not USE_COLOR:
+    Colors.GREEN = Colors.RED = Colors.YELLOW = Colors.BLUE = Colors.END = ''
+
+# Estado propio de cada hilo: su sesión HTTP y, en las pruebas que corren en paralelo,
+# las líneas de salida que se imprimen después en el orden de la suite
+_thread_state = threading.local()
+
+def _emit(text: str):
+    """Imprime el texto, o lo guarda si la prueba del hilo actual captura su salida"""
+    lines = getattr(_thread_state, "lines", None)
+    if lines is None:
+        print(text)
+    else:
+        lines.append(text)
+
 def print_test(name: str):
     """Imprime el nombre de la prueba"""
-    print(f"\n{Colors.BLUE}🧪 {name}{Colors.END}")
+    _emit(f"\n{Colors.BLUE}🧪 {name}{Colors.END}")
 
 def print_success(message: str):
     """Imprime mensaje de éxito"""
-    print(f"{Colors.GREEN}✅ {message}{Colors.END}")
+    _emit(f"{Colors.GREEN}✅ {message}{Colors.END}")
 
 def print_error(message: str):
     """Imprime mensaje de error"""
-    print(f"{Colors.RED}❌ {message}{Colors.END}")
+    _emit(f"{Colors.RED}❌ {message}{Colors.END}")
 
 def print_warning(message: str):
     """Imprime mensaje de advertencia"""
-    print(f"{Colors.YELLOW}⚠️  {message}{Colors.END}")
+    _emit(f"{Colors.YELLOW}⚠️  {message}{Colors.END}")
+
+# ============================================================================
+# Cliente HTTP
+# ============================================================================
 
-def verify_response_format(response: requests.Response, expect_success: bool = True) -> bool:
-    """Verifica que la respuesta tenga el formato correcto {data, error}"""
+# Adaptador compartido por todos los hilos: su pool de conexiones (urllib3) es seguro
+# entre hilos y reutiliza las conexiones TCP (keep-alive) en lugar de abrir una por
+# petición; reintenta errores transitorios del servidor o de red. Retry no reintenta
+# POST por defecto, así que las creaciones nunca se duplican.
+ADAPTER = HTTPAdapter(
+    pool_connections=MAX_CONCURRENT_REQUESTS,
+    pool_maxsize=MAX_CONCURRENT_REQUESTS,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+
+def _session() -> requests.Session:
+    """Sesión del hilo actual (requests.Session no es segura entre hilos); todas usan ADAPTER"""
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = _thread_state.session = requests.Session()
+        session.mount(BASE_URL, ADAPTER)
+    return session
+
+# Los cuerpos de los POST se serializan una sola vez al cargar el módulo (constantes con
+# orjson.dumps en cada sección) y se envían como bytes con este encabezado
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Respuestas GET por URL durante la ejecución: las precargadas y las ya pedidas (o la
+# excepción de conexión de una precarga, para relanzarla en la prueba que la usa).
+# Las pruebas en paralelo la invalidan a la vez, así que se modifica bajo el lock.
+_responses: Dict[str, Any] = {}
+_responses_lock = threading.Lock()
+
+def _fetch(url: str) -> Any:
+    """GET a la API que devuelve la excepción en lugar de lanzarla"""
     try:
-        data = response.json()
-        if "data" not in data or "error" not in data:
+        return _session().get(url)
+    except requests.RequestException as e:
+        return e
+
+def _invalidate(url: str):
+    """
+    Descarta las respuestas en caché del recurso escrito en url y las del dashboard,
+    que cuenta todos los recursos
+    """
+    path = url[len(BASE_URL):]
+    resource = BASE_URL + "/".join(path.split("/", 3)[:3])  # ".../api/sedes/1" -> ".../api/sedes"
+    with _responses_lock:
+        for cached in [u for u in _responses if u.startswith((resource, URL_DASHBOARD))]:
+            del _responses[cached]
+
+def prefetch(urls: List[str]):
+    """Lanza en paralelo los GET indicados y guarda sus respuestas para api_get"""
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+        _responses.update(zip(urls, pool.map(_fetch, urls)))
+
+def api_get(url: str) -> requests.Response:
+    """GET a la API; repite la respuesta en caché si el recurso no se ha modificado"""
+    response = _responses.get(url)
+    if response is None:
+        response = _session().get(url)
+        with _responses_lock:
+            _responses[url] = response
+    if isinstance(response, Exception):
+        raise response
+    return response
+
+def api_post(url: str, body: bytes) -> requests.Response:
+    """POST a la API con el cuerpo JSON ya serializado"""
+    response = _session().post(url, data=body, headers=JSON_HEADERS)
+    _invalidate(url)
+    return response
+
+def api_delete(url: str) -> requests.Response:
+    """DELETE a la API"""
+    response = _session().delete(url)
+    _invalidate(url)
+    return response
+
+def load_json(response: requests.Response) -> Any:
+    """Decodifica el cuerpo JSON de la respuesta con orjson (más rápido que json)"""
+    return orjson.loads(response.content)
+
+def verify_response_format(response: requests.Response, expect_success: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Verifica que la respuesta tenga el formato correcto {data, error}.
+    Devuelve el cuerpo ya decodificado si es correcto (para no volver a decodificarlo), o None.
+    """
+    try:
+        data = load_json(response)
+        if not ENVELOPE_KEYS <= data.keys():
             print_error(f"Formato de respuesta incorrecto. Esperado: {{data, error}}, Recibido: {list(data.keys())}")
-            return False
+            return None
         
         if expect_success:
             if data["error"] is not None:
                 print_error(f"Se esperaba éxito pero hay error: {data['error']}")
-                return False
+                return None
             if data["data"] is None:
                 print_error("Se esperaba data pero es None")
-                return False
+                return None
         else:
             if data["error"] is None:
                 print_error("Se esperaba error pero es None")
-                return False
+                return None
         
-        return True
+        return data
     except json.JSONDecodeError:
         print_error("La respuesta no es JSON válido")
-        return False
+        return None
 
 # ============================================================================
 # Tests de Health Check
@@ -67,9 +215,9 @@ def test_health_check():
     print_test("Health Check")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/health")
+        response = api_get(URL_HEALTH)
         if response.status_code == 200:
-            data = response.json()
+            data = load_json(response)
             if data.get("status") == "ok":
                 print_success("Health check OK")
                 return True
@@ -87,13 +235,28 @@ def test_health_check():
 # Tests de Sedes
 # ============================================================================
 
+NUEVA_SEDE = orjson.dumps({
+    "nombre": "Sede Test Temporal",
+    "direccion": "Calle Test 123",
+    "telefono": "6041234567",
+    "capacidad_maxima": 25,
+    "estado": "Activa",
+    "tipo": "Temporal"
+})
+
+SEDE_DUPLICADA = orjson.dumps({
+    "nombre": "Bello Principal",  # Ya existe
+    "direccion": "Otra dirección",
+    "estado": "Activa"
+})
+
 def test_get_sedes():
     """Prueba obtener todas las sedes"""
     print_test("GET /api/sedes - Listar todas las sedes")
     
-    response = requests.get(f"{BASE_URL}/api/sedes")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_SEDES)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Se obtuvieron {len(data)} sedes")
         return True
     return False
@@ -102,18 +265,9 @@ def test_create_sede_valid():
     """Prueba crear una sede válida"""
     print_test("POST /api/sedes - Crear sede válida")
     
-    nueva_sede = {
-        "nombre": "Sede Test Temporal",
-        "direccion": "Calle Test 123",
-        "telefono": "6041234567",
-        "capacidad_maxima": 25,
-        "estado": "Activa",
-        "tipo": "Temporal"
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/sedes", json=nueva_sede)
-    if response.status_code == 201 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_post(URL_SEDES, NUEVA_SEDE)
+    if response.status_code == 201 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Sede creada con ID: {data['id']}")
         return data["id"]
     return None
@@ -122,13 +276,7 @@ def test_create_sede_duplicate_name():
     """Prueba crear una sede con nombre duplicado (debe fallar)"""
     print_test("POST /api/sedes - Crear sede con nombre duplicado (debe fallar)")
     
-    sede_duplicada = {
-        "nombre": "Bello Principal",  # Ya existe
-        "direccion": "Otra dirección",
-        "estado": "Activa"
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/sedes", json=sede_duplicada)
+    response = api_post(URL_SEDES, SEDE_DUPLICADA)
     if response.status_code == 409:
         print_success("Validación de nombre duplicado funciona correctamente")
         return True
@@ -140,7 +288,7 @@ def test_delete_sede_with_participantes():
     """Prueba eliminar una sede con participantes (debe fallar)"""
     print_test("DELETE /api/sedes/1 - Eliminar sede con participantes (debe fallar)")
     
-    response = requests.delete(f"{BASE_URL}/api/sedes/1")
+    response = api_delete(URL_SEDE_1)
     if response.status_code == 409:
         print_success("Restricción de integridad funciona: no se puede eliminar sede con participantes")
         return True
@@ -152,13 +300,50 @@ def test_delete_sede_with_participantes():
 # Tests de Participantes
 # ============================================================================
 
+NUEVO_PARTICIPANTE = orjson.dumps({
+    "nombres": "Test",
+    "apellidos": "Usuario",
+    "tipo_documento": "CC",
+    "numero_documento": "9999999999",
+    "fecha_nacimiento": "2010-01-01",
+    "genero": "MASCULINO",
+    "fecha_ingreso": "2024-01-01",
+    "estado": "ACTIVO",
+    "id_sede": 1,
+    "telefono": "3009999999"
+})
+
+PARTICIPANTE_SEDE_INEXISTENTE = orjson.dumps({
+    "nombres": "Test",
+    "apellidos": "Usuario",
+    "tipo_documento": "CC",
+    "numero_documento": "8888888888",
+    "fecha_nacimiento": "2010-01-01",
+    "genero": "MASCULINO",
+    "fecha_ingreso": "2024-01-01",
+    "estado": "ACTIVO",
+    "id_sede": 999  # Sede inexistente
+})
+
+PARTICIPANTE_DOCUMENTO_DUPLICADO = orjson.dumps({
+    "nombres": "Test",
+    "apellidos": "Usuario",
+    "tipo_documento": "CC",
+    "numero_documento": "1234567890",  # Ya existe
+    "fecha_nacimiento": "2010-01-01",
+    "genero": "MASCULINO",
+    "fecha_ingreso": "2024-01-01",
+    "estado": "ACTIVO",
+    "id_sede": 1
+})
+
 def test_get_participantes():
     """Prueba obtener todos los participantes"""
     print_test("GET /api/participantes - Listar todos los participantes")
     
-    response = requests.get(f"{BASE_URL}/api/participantes")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_PARTICIPANTES)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Se obtuvieron {len(data)} participantes")
         # Verificar que incluye información de sede
         if len(data) > 0 and "sede" in data[0]:
@@ -170,22 +355,9 @@ def test_create_participante_valid():
     """Prueba crear un participante válido"""
     print_test("POST /api/participantes - Crear participante válido")
     
-    nuevo_participante = {
-        "nombres": "Test",
-        "apellidos": "Usuario",
-        "tipo_documento": "CC",
-        "numero_documento": "9999999999",
-        "fecha_nacimiento": "2010-01-01",
-        "genero": "MASCULINO",
-        "fecha_ingreso": "2024-01-01",
-        "estado": "ACTIVO",
-        "id_sede": 1,
-        "telefono": "3009999999"
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/participantes", json=nuevo_participante)
-    if response.status_code == 201 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_post(URL_PARTICIPANTES, NUEVO_PARTICIPANTE)
+    if response.status_code == 201 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Participante creado con ID: {data['id']}")
         return data["id"]
     return None
@@ -194,19 +366,7 @@ def test_create_participante_invalid_sede():
     """Prueba crear participante con sede inexistente (debe fallar)"""
     print_test("POST /api/participantes - Crear con sede inexistente (debe fallar)")
     
-    participante_invalido = {
-        "nombres": "Test",
-        "apellidos": "Usuario",
-        "tipo_documento": "CC",
-        "numero_documento": "8888888888",
-        "fecha_nacimiento": "2010-01-01",
-        "genero": "MASCULINO",
-        "fecha_ingreso": "2024-01-01",
-        "estado": "ACTIVO",
-        "id_sede": 999  # Sede inexistente
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/participantes", json=participante_invalido)
+    response = api_post(URL_PARTICIPANTES, PARTICIPANTE_SEDE_INEXISTENTE)
     if response.status_code == 400:
         print_success("Validación de sede existente funciona correctamente")
         return True
@@ -218,19 +378,7 @@ def test_create_participante_duplicate_document():
     """Prueba crear participante con documento duplicado (debe fallar)"""
     print_test("POST /api/participantes - Crear con documento duplicado (debe fallar)")
     
-    participante_duplicado = {
-        "nombres": "Test",
-        "apellidos": "Usuario",
-        "tipo_documento": "CC",
-        "numero_documento": "1234567890",  # Ya existe
-        "fecha_nacimiento": "2010-01-01",
-        "genero": "MASCULINO",
-        "fecha_ingreso": "2024-01-01",
-        "estado": "ACTIVO",
-        "id_sede": 1
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/participantes", json=participante_duplicado)
+    response = api_post(URL_PARTICIPANTES, PARTICIPANTE_DOCUMENTO_DUPLICADO)
     if response.status_code == 409:
         print_success("Validación de documento único funciona correctamente")
         return True
@@ -242,7 +390,7 @@ def test_delete_participante_with_dependencies():
     """Prueba eliminar participante con dependencias (debe fallar)"""
     print_test("DELETE /api/participantes/1 - Eliminar con dependencias (debe fallar)")
     
-    response = requests.delete(f"{BASE_URL}/api/participantes/1")
+    response = api_delete(URL_PARTICIPANTE_1)
     if response.status_code == 409:
         print_success("Restricción de integridad funciona: no se puede eliminar participante con dependencias")
         return True
@@ -254,13 +402,37 @@ def test_delete_participante_with_dependencies():
 # Tests de Acudientes
 # ============================================================================
 
+NUEVO_ACUDIENTE = orjson.dumps({
+    "nombres": "Test",
+    "apellidos": "Acudiente",
+    "tipo_documento": "CC",
+    "numero_documento": "7777777777",
+    "parentesco": "Padre",
+    "telefono": "3007777777",
+    "email": "test.acudiente@example.com",
+    "direccion": "Calle Test 456",
+    "id_participante": 1
+})
+
+ACUDIENTE_PARTICIPANTE_INEXISTENTE = orjson.dumps({
+    "nombres": "Test",
+    "apellidos": "Acudiente",
+    "tipo_documento": "CC",
+    "numero_documento": "6666666666",
+    "parentesco": "Padre",
+    "telefono": "3006666666",
+    "email": "test2@example.com",
+    "direccion": "Calle Test",
+    "id_participante": 999  # Participante inexistente
+})
+
 def test_get_acudientes():
     """Prueba obtener todos los acudientes"""
     print_test("GET /api/acudientes - Listar todos los acudientes")
     
-    response = requests.get(f"{BASE_URL}/api/acudientes")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_ACUDIENTES)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Se obtuvieron {len(data)} acudientes")
         return True
     return False
@@ -269,9 +441,9 @@ def test_get_acudientes_by_participante():
     """Prueba obtener acudientes de un participante"""
     print_test("GET /api/acudientes/participante/1 - Acudientes de un participante")
     
-    response = requests.get(f"{BASE_URL}/api/acudientes/participante/1")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_ACUDIENTES_PARTICIPANTE_1)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Se obtuvieron {len(data)} acudientes del participante 1")
         return True
     return False
@@ -280,21 +452,9 @@ def test_create_acudiente_valid():
     """Prueba crear un acudiente válido"""
     print_test("POST /api/acudientes - Crear acudiente válido")
     
-    nuevo_acudiente = {
-        "nombres": "Test",
-        "apellidos": "Acudiente",
-        "tipo_documento": "CC",
-        "numero_documento": "7777777777",
-        "parentesco": "Padre",
-        "telefono": "3007777777",
-        "email": "test.acudiente@example.com",
-        "direccion": "Calle Test 456",
-        "id_participante": 1
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/acudientes", json=nuevo_acudiente)
-    if response.status_code == 201 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_post(URL_ACUDIENTES, NUEVO_ACUDIENTE)
+    if response.status_code == 201 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Acudiente creado con ID: {data['id_acudiente']}")
         return data["id_acudiente"]
     return None
@@ -303,19 +463,7 @@ def test_create_acudiente_invalid_participante():
     """Prueba crear acudiente con participante inexistente (debe fallar)"""
     print_test("POST /api/acudientes - Crear con participante inexistente (debe fallar)")
     
-    acudiente_invalido = {
-        "nombres": "Test",
-        "apellidos": "Acudiente",
-        "tipo_documento": "CC",
-        "numero_documento": "6666666666",
-        "parentesco": "Padre",
-        "telefono": "3006666666",
-        "email": "test2@example.com",
-        "direccion": "Calle Test",
-        "id_participante": 999  # Participante inexistente
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/acudientes", json=acudiente_invalido)
+    response = api_post(URL_ACUDIENTES, ACUDIENTE_PARTICIPANTE_INEXISTENTE)
     if response.status_code == 400:
         print_success("Validación de participante existente funciona correctamente")
         return True
@@ -327,7 +475,7 @@ def test_delete_acudiente_with_mensualidades():
     """Prueba eliminar acudiente con mensualidades (debe fallar)"""
     print_test("DELETE /api/acudientes/1 - Eliminar con mensualidades (debe fallar)")
     
-    response = requests.delete(f"{BASE_URL}/api/acudientes/1")
+    response = api_delete(URL_ACUDIENTE_1)
     if response.status_code == 409:
         print_success("Restricción de integridad funciona: no se puede eliminar acudiente con mensualidades")
         return True
@@ -339,17 +487,59 @@ def test_delete_acudiente_with_mensualidades():
 # Tests de Mensualidades
 # ============================================================================
 
+NUEVA_MENSUALIDAD = orjson.dumps({
+    "participant_id": 1,
+    "id_acudiente": 1,
+    "mes": 3,
+    "año": 2024,
+    "monto": 50000.0,
+    "estado": "PAGADA",
+    "metodo_pago": "TRANSFERENCIA",
+    "fecha_pago": "2024-03-05",
+    "observaciones": "Pago de prueba"
+})
+
+MENSUALIDAD_DUPLICADA = orjson.dumps({
+    "participant_id": 1,
+    "id_acudiente": 1,
+    "mes": 1,  # Ya existe para participante 1 en enero 2024
+    "año": 2024,
+    "monto": 50000.0,
+    "estado": "PENDIENTE",
+    "metodo_pago": "TRANSFERENCIA"
+})
+
+MENSUALIDAD_ACUDIENTE_AJENO = orjson.dumps({
+    "participant_id": 1,
+    "id_acudiente": 3,  # Este acudiente pertenece al participante 3, no al 1
+    "mes": 4,
+    "año": 2024,
+    "monto": 50000.0,
+    "estado": "PENDIENTE",
+    "metodo_pago": "TRANSFERENCIA"
+})
+
+MENSUALIDAD_PAGADA_SIN_FECHA = orjson.dumps({
+    "participant_id": 2,
+    "mes": 5,
+    "año": 2024,
+    "monto": 50000.0,
+    "estado": "PAGADA",
+    "metodo_pago": "TRANSFERENCIA"
+    # Falta fecha_pago
+})
+
 def test_get_mensualidades():
     """Prueba obtener todas las mensualidades"""
     print_test("GET /api/mensualidades - Listar todas las mensualidades")
     
-    response = requests.get(f"{BASE_URL}/api/mensualidades")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_MENSUALIDADES)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Se obtuvieron {len(data)} mensualidades")
         # Verificar que incluye datos relacionados
         if len(data) > 0:
-            if "participant_name" in data[0] and "sede_name" in data[0]:
+            if MENSUALIDAD_RELATED_KEYS <= data[0].keys():
                 print_success("Las mensualidades incluyen datos relacionados (participante, sede)")
         return True
     return False
@@ -358,9 +548,9 @@ def test_get_mensualidades_by_participante():
     """Prueba obtener mensualidades de un participante"""
     print_test("GET /api/mensualidades/participante/1 - Mensualidades de un participante")
     
-    response = requests.get(f"{BASE_URL}/api/mensualidades/participante/1")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_MENSUALIDADES_PARTICIPANTE_1)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Se obtuvieron {len(data)} mensualidades del participante 1")
         return True
     return False
@@ -369,21 +559,9 @@ def test_create_mensualidad_valid():
     """Prueba crear una mensualidad válida"""
     print_test("POST /api/mensualidades - Crear mensualidad válida")
     
-    nueva_mensualidad = {
-        "participant_id": 1,
-        "id_acudiente": 1,
-        "mes": 3,
-        "año": 2024,
-        "monto": 50000.0,
-        "estado": "PAGADA",
-        "metodo_pago": "TRANSFERENCIA",
-        "fecha_pago": "2024-03-05",
-        "observaciones": "Pago de prueba"
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/mensualidades", json=nueva_mensualidad)
-    if response.status_code == 201 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_post(URL_MENSUALIDADES, NUEVA_MENSUALIDAD)
+    if response.status_code == 201 and (body := verify_response_format(response)):
+        data = body["data"]
         print_success(f"Mensualidad creada con ID: {data['id']}")
         return data["id"]
     return None
@@ -392,17 +570,7 @@ def test_create_mensualidad_duplicate():
     """Prueba crear mensualidad duplicada (mismo participante, mes, año) - debe fallar"""
     print_test("POST /api/mensualidades - Crear duplicada (debe fallar)")
     
-    mensualidad_duplicada = {
-        "participant_id": 1,
-        "id_acudiente": 1,
-        "mes": 1,  # Ya existe para participante 1 en enero 2024
-        "año": 2024,
-        "monto": 50000.0,
-        "estado": "PENDIENTE",
-        "metodo_pago": "TRANSFERENCIA"
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/mensualidades", json=mensualidad_duplicada)
+    response = api_post(URL_MENSUALIDADES, MENSUALIDAD_DUPLICADA)
     if response.status_code == 409:
         print_success("Validación de mensualidad única funciona correctamente")
         return True
@@ -414,17 +582,7 @@ def test_create_mensualidad_acudiente_wrong_participante():
     """Prueba crear mensualidad con acudiente que no pertenece al participante (debe fallar)"""
     print_test("POST /api/mensualidades - Acudiente no pertenece al participante (debe fallar)")
     
-    mensualidad_invalida = {
-        "participant_id": 1,
-        "id_acudiente": 3,  # Este acudiente pertenece al participante 3, no al 1
-        "mes": 4,
-        "año": 2024,
-        "monto": 50000.0,
-        "estado": "PENDIENTE",
-        "metodo_pago": "TRANSFERENCIA"
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/mensualidades", json=mensualidad_invalida)
+    response = api_post(URL_MENSUALIDADES, MENSUALIDAD_ACUDIENTE_AJENO)
     if response.status_code == 400:
         print_success("Validación de relación acudiente-participante funciona correctamente")
         return True
@@ -436,17 +594,7 @@ def test_create_mensualidad_pagada_sin_fecha():
     """Prueba crear mensualidad PAGADA sin fecha de pago (debe fallar)"""
     print_test("POST /api/mensualidades - PAGADA sin fecha_pago (debe fallar)")
     
-    mensualidad_invalida = {
-        "participant_id": 2,
-        "mes": 5,
-        "año": 2024,
-        "monto": 50000.0,
-        "estado": "PAGADA",
-        "metodo_pago": "TRANSFERENCIA"
-        # Falta fecha_pago
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/mensualidades", json=mensualidad_invalida)
+    response = api_post(URL_MENSUALIDADES, MENSUALIDAD_PAGADA_SIN_FECHA)
     if response.status_code == 400:
         print_success("Validación de fecha_pago requerida funciona correctamente")
         return True
@@ -462,9 +610,9 @@ def test_dashboard_stats():
     """Prueba obtener estadísticas del dashboard"""
     print_test("GET /api/dashboard/stats - Estadísticas del dashboard")
     
-    response = requests.get(f"{BASE_URL}/api/dashboard/stats")
-    if response.status_code == 200 and verify_response_format(response):
-        data = response.json()["data"]
+    response = api_get(URL_DASHBOARD_STATS)
+    if response.status_code == 200 and (body := verify_response_format(response)):
+        data = body["data"]
         if "participantes" in data and "mensualidades" in data and "acudientes" in data:
             print_success(f"Estadísticas: {data['participantes']} participantes, {data['acudientes']} acudientes, {data['mensualidades']} mensualidades")
             return True
@@ -478,7 +626,7 @@ def test_get_participante_not_found():
     """Prueba obtener participante inexistente (debe retornar 404)"""
     print_test("GET /api/participantes/999 - Recurso no encontrado (debe retornar 404)")
     
-    response = requests.get(f"{BASE_URL}/api/participantes/999")
+    response = api_get(URL_PARTICIPANTE_INEXISTENTE)
     if response.status_code == 404:
         print_success("Manejo de recurso no encontrado funciona correctamente")
         return True
@@ -490,18 +638,54 @@ def test_get_participante_not_found():
 # Función Principal
 # ============================================================================
 
-def run_all_tests():
-    """Ejecuta todas las pruebas"""
+# Pruebas de creación válidas que no dependen unas de otras (la sede 1 y el participante 1
+# ya existen). Corren juntas en paralelo en el lugar de la última de ellas en la suite:
+# ninguna creación llega antes que las pruebas que el orden serial ponía delante.
+INDEPENDENT_CREATES = (
+    test_create_sede_valid,
+    test_create_participante_valid,
+    test_create_acudiente_valid,
+)
+
+# Pruebas de restricciones de integridad al eliminar: su comportamiento casi no cambia,
+# así que el modo smoke las omite para iterar más rápido
+GUARD_TESTS = {
+    test_delete_sede_with_participantes,
+    test_delete_participante_with_dependencies,
+    test_delete_acudiente_with_mensualidades,
+}
+
+def _run_test(test_func) -> bool:
+    """Ejecuta una prueba; las de creación devuelven el ID creado (cualquier valor verdadero es éxito)"""
+    try:
+        return bool(test_func())
+    except Exception as e:
+        print_error(f"Excepción en prueba: {e}")
+        return False
+
+def _run_test_captured(test_func) -> Tuple[bool, List[str]]:
+    """Ejecuta una prueba en un hilo del pool y devuelve su resultado y su salida"""
+    _thread_state.lines = []
+    try:
+        return _run_test(test_func), _thread_state.lines
+    finally:
+        _thread_state.lines = None
+
+def _run_parallel(test_funcs: List) -> List[bool]:
+    """Ejecuta las pruebas en paralelo e imprime la salida de cada una en orden"""
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+        results = list(pool.map(_run_test_captured, test_funcs))
+    for _, lines in results:
+        for line in lines:
+            print(line)
+    return [passed for passed, _ in results]
+
+def run_all_tests(mode: str = "full"):
+    """Ejecuta todas las pruebas (o el subconjunto smoke, sin GUARD_TESTS)"""
     print(f"\n{Colors.BLUE}{'='*70}")
     print("🚀 INICIANDO PRUEBAS DE INTEGRACIÓN")
     print(f"{'='*70}{Colors.END}\n")
     
-    results = {
-        "passed": 0,
-        "failed": 0,
-        "total": 0
-    }
-    
     tests = [
         # Health Check
         ("Health Check", test_health_check),
@@ -541,17 +725,31 @@ def run_all_tests():
         ("Recurso No Encontrado (404)", test_get_participante_not_found),
     ]
     
-    for test_name, test_func in tests:
-        results["total"] += 1
-        try:
-            result = test_func()
-            if result or result is True:
-                results["passed"] += 1
-            else:
-                results["failed"] += 1
-        except Exception as e:
-            print_error(f"Excepción en prueba: {e}")
-            results["failed"] += 1
+    # Las lecturas independientes viajan en paralelo antes de empezar
+    prefetch(READ_ONLY_URLS)
+    
+    if mode == "smoke":
+        tests = [(name, func) for name, func in tests if func not in GUARD_TESTS]
+        print_warning("Modo smoke: se omiten las pruebas de integridad al eliminar")
+    
+    # Resultado de cada prueba (1 = exitosa, 0 = fallida); los totales se calculan al final
+    outcomes = bytearray(len(tests))
+    parallel = [i for i, (_, test_func) in enumerate(tests) if test_func in INDEPENDENT_CREATES]
+    for i, (test_name, test_func) in enumerate(tests):
+        if i in parallel:
+            # Las creaciones independientes se lanzan todas juntas al llegar a la última
+            if i == parallel[-1]:
+                for j, passed in zip(parallel, _run_parallel([tests[j][1] for j in parallel])):
+                    outcomes[j] = passed
+            continue
+        outcomes[i] = _run_test(test_func)
+    
+    passed = sum(outcomes)
+    results = {
+        "passed": passed,
+        "failed": len(tests) - passed,
+        "total": len(tests)
+    }
     
     # Resumen
     print(f"\n{Colors.BLUE}{'='*70}")
@@ -571,4 +769,11 @@ def run_all_tests():
         print(f"\n{Colors.YELLOW}⚠️  Algunas pruebas fallaron. Revisa los detalles arriba.{Colors.END}\n")
 
 if __name__ == "__main__":
-    run_all_tests()
+    parser = argparse.ArgumentParser(description="Pruebas de integración de la API")
+    parser.add_argument(
+        "--mode",
+        choices=["full", "smoke"],
+        default="smoke" if os.getenv("SMOKE") == "1" else "full",
+        help="full ejecuta todas las pruebas; smoke omite las de integridad al eliminar"
+    )
+    run_all_tests(parser.parse_args().mode)